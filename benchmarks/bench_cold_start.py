@@ -0,0 +1,40 @@
+import subprocess
+import sys
+import time
+
+# Each case runs in a fresh interpreter, so the timing is the full cold start
+# a cron container or laptop pays before any pipeline work happens
+CASES = {
+    "python (empty interpreter)": "pass",
+    "dataflow --help": "from src.orchestration.cli import main; main(['--help'])",
+    "dataflow bronze/silver/gold imports": (
+        "import src.orchestration.cli, src.orchestration.runner, "
+        "src.pipeline.bronze, src.pipeline.silver, src.pipeline.gold"
+    ),
+    "dataflow backfill imports (+ warehouse)": (
+        "import src.orchestration.cli, src.orchestration.runner, "
+        "src.pipeline.bronze, src.pipeline.silver, src.pipeline.gold, src.warehouse.db"
+    ),
+    "flows/etl_flow.py imports (Prefect)": "import sys; sys.path.insert(0, 'flows'); import etl_flow",
+}
+
+
+def cold_start(code: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(repeat: int = 5):
+    for name, code in CASES.items():
+        try:
+            print(f"  {name:<42} {cold_start(code, repeat) * 1000:8.0f} ms")
+        except subprocess.CalledProcessError as e:
+            print(f"  {name:<42} unavailable ({e.stderr.decode().strip().splitlines()[-1]})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
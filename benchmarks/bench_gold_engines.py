@@ -0,0 +1,82 @@
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import polars as pl
+
+from src.pipeline.gold import to_gold
+from src.pipeline.gold_sql import GOLD_TABLES, to_gold_duckdb
+from src.pipeline.layout import write_parquet
+from src.warehouse.db import build_warehouse
+
+EVENT_TYPES = ["PushEvent", "WatchEvent", "CreateEvent", "PullRequestEvent", "IssueCommentEvent", "ForkEvent"]
+CATEGORIES = ["code", "social", "code", "review", "issues", "social"]
+
+
+def make_silver(n_events: int) -> pl.DataFrame:
+    rng = np.random.default_rng(0)
+    type_idx = rng.integers(0, len(EVENT_TYPES), n_events)
+    repo_ids = rng.zipf(1.3, n_events) % (n_events // 3)
+    actor_ids = rng.zipf(1.5, n_events) % (n_events // 4)
+    seconds = np.sort(rng.integers(0, 3600, n_events))
+    return (
+        pl.DataFrame({
+            "id": np.arange(n_events).astype(str),
+            "type": pl.Series(type_idx).replace_strict(dict(enumerate(EVENT_TYPES))),
+            "actor_login": pl.Series(actor_ids).cast(pl.Utf8).str.replace("^", "user"),
+            "repo_name": pl.Series(repo_ids).cast(pl.Utf8).str.replace("^(.*)$", "owner$1/repo$1"),
+            "created_at": pl.Series((seconds + int(datetime(2024, 1, 1).timestamp())) * 1_000_000).cast(pl.Datetime("us")),
+            "org": pl.Series(np.where(repo_ids % 5 == 0, "someorg", "")).replace("", None),
+            "event_category": pl.Series(type_idx).replace_strict(dict(enumerate(CATEGORIES))),
+        })
+        .with_columns([
+            pl.lit("2024-01-01").alias("date"),
+            pl.lit(0).cast(pl.Int32).alias("hour"),
+            pl.col("created_at").dt.hour().alias("hour_of_day"),
+            pl.col("org").is_not_null().alias("is_org_event"),
+            pl.when(pl.col("type") == "PushEvent").then(pl.col("created_at").dt.second().cast(pl.Int64) % 5 + 1)
+              .alias("push_commits"),
+            (pl.col("type") == "PullRequestEvent").alias("is_pr_closed"),
+            ((pl.col("type") == "PullRequestEvent") & (pl.col("created_at").dt.second() % 3 > 0)).alias("is_pr_merged"),
+        ])
+    )
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(*sizes: int, repeat: int = 3):
+    for n_events in sizes or (1_000_000, 10_000_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            (tmp / "silver").mkdir()
+            write_parquet(make_silver(n_events), tmp / "silver" / "2024-01-01-0.parquet")
+
+            with patch("src.pipeline.gold.SILVER_PATH", tmp / "silver"), \
+                 patch("src.pipeline.gold_sql.SILVER_PATH", tmp / "silver"), \
+                 patch("src.pipeline.gold.GOLD_PATH", tmp / "gold"), \
+                 patch("src.pipeline.gold_sql.GOLD_PATH", tmp / "gold"), \
+                 patch("src.warehouse.db.GOLD_PATH", tmp / "gold"), \
+                 patch("src.warehouse.db.DB_PATH", tmp / "warehouse.db"):
+                non_gold = ("repo_similarity", "trending_repos", "trending_contributors")
+                polars_engine = timed(lambda: (to_gold(2024, 1, 1, 0), build_warehouse(skip=non_gold)), repeat)
+                duckdb_engine = timed(lambda: to_gold_duckdb(2024, 1, 1, 0), repeat)
+                duckdb_export = timed(lambda: to_gold_duckdb(2024, 1, 1, 0, export_parquet=True), repeat)
+
+            print(f"{n_events:>12,} events  polars + build_warehouse {polars_engine:6.2f}s   "
+                  f"duckdb {duckdb_engine:6.2f}s ({polars_engine / duckdb_engine:.1f}x)   "
+                  f"duckdb + parquet export {duckdb_export:6.2f}s  [{len(GOLD_TABLES)} tables]")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,119 @@
+import gzip
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.ingestion.gharchive import lookup, parse_events, payload_column, payload_fields
+
+EVENT_TYPES = ["PushEvent", "PushEvent", "PushEvent", "WatchEvent", "CreateEvent",
+               "PullRequestEvent", "IssueCommentEvent", "IssuesEvent", "ForkEvent"]
+
+
+def user(rng: random.Random, login: str) -> dict:
+    return {"login": login, "id": rng.randint(1, 10**8), "node_id": "MDQ6VXNlcjE=", "type": "User",
+            "avatar_url": f"https://avatars.githubusercontent.com/u/{login}?", "site_admin": False,
+            **{f"{key}_url": f"https://api.github.com/users/{login}/{key}" for key in
+               ("html", "followers", "following", "gists", "starred", "subscriptions", "organizations",
+                "repos", "events", "received_events")}}
+
+
+def pull_request(rng: random.Random, repo: str, login: str) -> dict:
+    return {"url": f"https://api.github.com/repos/{repo}/pulls/1", "id": rng.randint(1, 10**9),
+            "number": rng.randint(1, 5000), "state": "closed", "locked": False,
+            "title": "Fix " * rng.randint(2, 12), "user": user(rng, login), "body": "x" * rng.randint(0, 2000),
+            "created_at": "2024-01-01T00:00:00Z", "merged": rng.random() < 0.6, "mergeable": None,
+            "comments": rng.randint(0, 20), "commits": rng.randint(1, 30), "additions": rng.randint(0, 900),
+            "deletions": rng.randint(0, 900), "changed_files": rng.randint(1, 40),
+            "head": {"label": f"{login}:patch", "ref": "patch", "sha": "0" * 40, "user": user(rng, login)},
+            "base": {"label": "main", "ref": "main", "sha": "1" * 40, "user": user(rng, repo.split("/")[0])}}
+
+
+def make_event(rng: random.Random, i: int) -> dict:
+    event_type = rng.choice(EVENT_TYPES)
+    login = f"user{rng.randint(0, 50_000)}"
+    repo = f"owner{rng.randint(0, 20_000)}/repo{rng.randint(0, 5)}"
+    if event_type == "PushEvent":
+        size = rng.randint(1, 5)
+        payload = {"push_id": i, "size": size, "distinct_size": size, "ref": "refs/heads/main",
+                   "head": "0" * 40, "before": "1" * 40,
+                   "commits": [{"sha": "2" * 40, "author": {"email": f"{login}@example.com", "name": login},
+                                "message": "Update " * rng.randint(1, 30), "distinct": True,
+                                "url": f"https://api.github.com/repos/{repo}/commits/{'2' * 40}"}
+                               for _ in range(size)]}
+    elif event_type == "PullRequestEvent":
+        payload = {"action": rng.choice(["opened", "closed"]), "number": 1,
+                   "pull_request": pull_request(rng, repo, login)}
+    elif event_type in ("IssuesEvent", "IssueCommentEvent"):
+        payload = {"action": rng.choice(["opened", "closed", "created"]),
+                   "issue": {"number": 1, "title": "Bug", "user": user(rng, login), "body": "y" * rng.randint(0, 1500)}}
+    else:
+        payload = {"action": "started"} if event_type == "WatchEvent" else {"ref": "main", "ref_type": "branch"}
+    return {"id": str(i), "type": event_type, "actor": {"id": i, "login": login, "display_login": login,
+            "gravatar_id": "", "url": f"https://api.github.com/users/{login}"},
+            "repo": {"id": i, "name": repo, "url": f"https://api.github.com/repos/{repo}"},
+            "payload": payload, "public": True, "created_at": "2024-01-01T00:00:00Z",
+            **({"org": {"id": 1, "login": repo.split("/")[0]}} if rng.random() < 0.2 else {})}
+
+
+def parse_events_json(file_path: Path, fields: dict[str, type]) -> list[dict]:
+    # Previous ingest path: stdlib json.loads of every full line
+    events = []
+    with gzip.open(file_path, "rt", encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            row = {
+                "id": event.get("id"),
+                "type": event.get("type"),
+                "actor_login": event.get("actor", {}).get("login"),
+                "repo_name": event.get("repo", {}).get("name"),
+                "created_at": event.get("created_at"),
+                "public": event.get("public", True),
+                "org": event.get("org", {}).get("login") if event.get("org") else None,
+            }
+            for path in fields:
+                row[payload_column(path)] = lookup(event, path.split("."))
+            events.append(row)
+    return events
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n_events: int = 200_000, repeat: int = 3):
+    rng = random.Random(0)
+    fields = payload_fields()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "2024-01-01-0.json.gz"
+        raw_bytes = 0
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            for i in range(n_events):
+                line = json.dumps(make_event(rng, i)) + "\n"
+                raw_bytes += len(line)
+                f.write(line)
+        print(f"{n_events:,} events, {raw_bytes / 1e6:.0f} MB raw JSON, {path.stat().st_size / 1e6:.0f} MB gzip")
+
+        runs = {
+            "json.loads, no payload": lambda: parse_events_json(path, {}),
+            f"json.loads, {len(fields)} payload paths": lambda: parse_events_json(path, fields),
+            "typed decode, no payload": lambda: parse_events(path, {}),
+            f"typed decode, {len(fields)} payload paths": lambda: parse_events(path, fields),
+        }
+        baseline = None
+        for name, fn in runs.items():
+            seconds = timed(fn, repeat)
+            baseline = baseline or seconds
+            print(f"  {name:<32} {seconds:6.2f}s  {n_events / seconds / 1000:7.1f}k events/s  "
+                  f"{raw_bytes / seconds / 1e6:6.1f} MB/s  ({baseline / seconds:.2f}x)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
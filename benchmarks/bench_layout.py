@@ -0,0 +1,82 @@
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from src.pipeline.layout import compact_layer, write_parquet
+
+EVENT_TYPES = ["PushEvent", "WatchEvent", "CreateEvent", "PullRequestEvent", "IssueCommentEvent", "ForkEvent"]
+
+
+def make_hour(day: datetime, hour: int, n_events: int, n_repos: int) -> pl.DataFrame:
+    rng = random.Random(day.day * 24 + hour)
+    start = day + timedelta(hours=hour)
+    return pl.DataFrame({
+        "id": [f"{day:%Y%m%d}{hour:02d}{i}" for i in range(n_events)],
+        "type": [rng.choice(EVENT_TYPES) for _ in range(n_events)],
+        "actor_login": [f"user{rng.randrange(n_repos // 2)}" for _ in range(n_events)],
+        "repo_name": [f"owner{(r := rng.randrange(n_repos)) % 997}/repo{r}" for _ in range(n_events)],
+        "created_at": [start + timedelta(seconds=rng.randrange(3600)) for _ in range(n_events)],
+        "date": [f"{day:%Y-%m-%d}"] * n_events,
+        "hour": pl.Series([hour] * n_events, dtype=pl.Int32),
+    })
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scan_queries(glob: str) -> dict[str, float]:
+    conn = duckdb.connect()
+    return {
+        "point lookup (repo_name =)": timed(lambda: conn.execute(
+            f"SELECT COUNT(*) FROM read_parquet('{glob}') WHERE repo_name = 'owner3/repo3000'").fetchone()),
+        "range scan (created_at 10min)": timed(lambda: conn.execute(
+            f"SELECT COUNT(*) FROM read_parquet('{glob}') "
+            "WHERE created_at BETWEEN '2024-01-01 05:00:00' AND '2024-01-01 05:10:00'").fetchone()),
+        "full aggregate (group by repo)": timed(lambda: conn.execute(
+            f"SELECT repo_name, COUNT(*) FROM read_parquet('{glob}') GROUP BY repo_name").fetchall()),
+    }
+
+
+def main(days: int = 2, events_per_hour: int = 100_000, n_repos: int = 50_000):
+    root = Path(tempfile.mkdtemp(prefix="dataflow-layout-"))
+    baseline, optimized = root / "baseline", root / "optimized"
+    baseline.mkdir()
+    optimized.mkdir()
+
+    for d in range(days):
+        day = datetime(2024, 1, 1) + timedelta(days=d)
+        for hour in range(24):
+            df = make_hour(day, hour, events_per_hour, n_repos)
+            name = f"{day:%Y-%m-%d}-{hour}.parquet"
+            df.write_parquet(baseline / name)
+            write_parquet(df, optimized / name)
+
+    compact_layer(optimized, "day")
+
+    print(f"{days * 24 * events_per_hour:,} events, {days * 24} hourly files vs {days} daily files")
+    before = scan_queries(f"{baseline}/*.parquet")
+    after = scan_queries(f"{optimized}/*.parquet")
+    for name in before:
+        print(f"  {name:<32} {before[name] * 1000:8.1f} ms → {after[name] * 1000:8.1f} ms "
+              f"({before[name] / after[name]:.1f}x)")
+
+    size = lambda p: sum(f.stat().st_size for f in p.iterdir()) / 1024 / 1024
+    print(f"  {'on-disk size':<32} {size(baseline):8.1f} MB → {size(optimized):8.1f} MB")
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,50 @@
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+import polars as pl
+
+from src.pipeline.gold import with_ranks
+from src.pipeline.ranking import REPO_SORT_KEYS
+
+
+def timed(conn: duckdb.DuckDBPyConnection, sql: str, params: list, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(n_repos: int = 1_000_000, page_size: int = 50):
+    rng = random.Random(0)
+    repos = pl.DataFrame({
+        "repo_name": [f"owner{i % 997}/repo{i}" for i in range(n_repos)],
+        **{key: [int(rng.paretovariate(1.2)) for _ in range(n_repos)] for key in REPO_SORT_KEYS},
+    })
+    start = time.perf_counter()
+    ranked = with_ranks(repos, REPO_SORT_KEYS, "repo_name")
+    print(f"{n_repos:,} repos — ranking {len(REPO_SORT_KEYS)} keys in gold: {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ranked.write_parquet(Path(tmp) / "top_repos.parquet")
+        conn = duckdb.connect(str(Path(tmp) / "bench.db"))
+        conn.execute(f"CREATE TABLE top_repos AS SELECT * FROM read_parquet('{tmp}/top_repos.parquet')")
+
+        for sort_by in ("total_events", "star_count"):
+            for depth in (0, n_repos // 2, n_repos - page_size):
+                offset = timed(conn, f"SELECT * FROM top_repos ORDER BY {sort_by} DESC, repo_name "
+                                     "LIMIT ? OFFSET ?", [page_size, depth])
+                keyset = timed(conn, f"SELECT * FROM top_repos WHERE {sort_by}_rank BETWEEN ? AND ? "
+                                     f"ORDER BY {sort_by}_rank", [depth + 1, depth + page_size])
+                print(f"  {sort_by:<13} page at rank {depth:>9,}: OFFSET {offset * 1000:7.2f} ms"
+                      f"   keyset {keyset * 1000:6.2f} ms")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -1,9 +1,17 @@
+from src.config.resources import set_role
+
+set_role("pipeline")
+
+import os
 from prefect import flow, task
 from prefect.logging import get_run_logger
 from datetime import datetime, timezone
 from src.pipeline.bronze import to_bronze
 from src.pipeline.silver import to_silver
 from src.pipeline.gold import to_gold
+from src.pipeline.gold_sql import to_gold_duckdb
+from src.pipeline.similarity import to_repo_similarity
+from src.pipeline.trending import update_trending
 
 
 @task(name="ingest-to-bronze", retries=3, retry_delay_seconds=10)
@@ -25,22 +33,45 @@ def silver_task(year: int, month: int, day: int, hour: int):
 
 
 @task(name="aggregate-to-gold")
-def gold_task(year: int, month: int, day: int, hour: int):
+def gold_task(year: int, month: int, day: int, hour: int, engine: str | None = None, export_parquet: bool = False):
+    logger = get_run_logger()
+    engine = engine or os.getenv("DATAFLOW_GOLD_ENGINE", "polars")
+    logger.info(f"Starting gold aggregation ({engine} engine)")
+    if engine == "duckdb":
+        counts = to_gold_duckdb(year, month, day, hour, export_parquet=export_parquet)
+    else:
+        counts = {k: len(v) for k, v in to_gold(year, month, day, hour).items()}
+    logger.info(f"Gold complete: {sum(counts.values())} total rows across {len(counts)} tables")
+    return counts
+
+
+@task(name="update-trending")
+def trending_task(year: int, month: int, day: int, hour: int):
     logger = get_run_logger()
-    logger.info(f"Starting gold aggregation")
-    gold = to_gold(year, month, day, hour)
-    total = sum(len(v) for v in gold.values())
-    logger.info(f"Gold complete: {total} total rows across {len(gold)} tables")
-    return {k: len(v) for k, v in gold.items()}
+    logger.info(f"Updating trending windows")
+    trending = update_trending(year, month, day, hour)
+    logger.info(f"Trending complete: {', '.join(f'{k}={len(v)}' for k, v in trending.items())}")
+    return {k: len(v) for k, v in trending.items()}
+
+
+@task(name="build-repo-similarity")
+def similarity_task(year: int, month: int, day: int, hour: int):
+    logger = get_run_logger()
+    logger.info(f"Starting repo similarity")
+    df = to_repo_similarity(year, month, day, hour)
+    logger.info(f"Repo similarity complete: {len(df)} rows")
+    return len(df)
 
 
 @flow(name="dataflow-etl", log_prints=True)
-def etl_flow(year: int, month: int, day: int, hour: int):
+def etl_flow(year: int, month: int, day: int, hour: int, engine: str | None = None, export_parquet: bool = False):
     print(f"Starting ETL flow for {year}-{month:02d}-{day:02d} hour {hour}")
 
     bronze_count = bronze_task(year, month, day, hour)
     silver_count = silver_task(year, month, day, hour)
-    gold_counts = gold_task(year, month, day, hour)
+    gold_counts = gold_task(year, month, day, hour, engine, export_parquet)
+    gold_counts["repo_similarity"] = similarity_task(year, month, day, hour)
+    gold_counts.update(trending_task(year, month, day, hour))
 
     print(f"Pipeline complete:")
     print(f"  Bronze: {bronze_count} rows")
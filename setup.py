@@ -3,4 +3,10 @@ from setuptools import setup, find_packages
 setup(
     name="dataflow",
     packages=find_packages(),
-)
\ No newline at end of file
+    extras_require={
+        "prefect": ["prefect==3.1.15"],
+    },
+    entry_points={
+        "console_scripts": ["dataflow=src.orchestration.cli:main"],
+    },
+)
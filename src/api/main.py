@@ -1,9 +1,23 @@
-from fastapi import FastAPI, HTTPException, Query
+import json
+import os
+import time
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from loguru import logger
+from src.config.resources import set_role
+
+set_role("api")
+
 from src.warehouse.db import (
     get_top_repos, get_event_distribution,
     get_hourly_activity, get_top_contributors,
-    get_summary_stats, build_warehouse
+    get_summary_stats, get_related_repos, get_trending_repos,
+    get_trending_contributors, build_warehouse
+)
+from src.pipeline.ranking import CONTRIBUTOR_SORT_KEYS, REPO_SORT_KEYS
+from src.warehouse.profiling import (
+    ALLOW_PROFILE, SLOW_QUERY_MS, UNMATCHED_ENDPOINT, RequestProfile, profile_request, record_timing,
+    reset_timings, server_timing, timing_summary
 )
 from pathlib import Path
 
@@ -14,8 +28,49 @@ app = FastAPI(
 )
 
 
+def record_request(request: Request, total_ms: float, profile: RequestProfile, status_code: int) -> None:
+    # Unmatched URLs share one key, so scanning random paths can't grow _stats
+    route = request.scope.get("route")
+    endpoint = f"{request.method} {route.path}" if route else UNMATCHED_ENDPOINT
+    record_timing(endpoint, total_ms, profile.phases)
+    if total_ms >= SLOW_QUERY_MS:
+        phases = ", ".join(f"{name}={ms:.1f}ms" for name, ms in profile.phases.items())
+        sql = " | ".join(q["sql"] for q in profile.queries)
+        logger.bind(slow_query=True).warning(
+            f"Slow request {endpoint} {status_code} {total_ms:.1f}ms ({phases}) — {sql}"
+        )
+
+
+@app.middleware("http")
+async def query_timing(request: Request, call_next):
+    explain = ALLOW_PROFILE and (request.headers.get("x-debug-profile") == "1"
+                                 or request.query_params.get("profile") in ("1", "true"))
+    start = time.perf_counter()
+    with profile_request(explain) as profile:
+        try:
+            response = await call_next(request)
+        except Exception:
+            # Requests that fail in the endpoint or while rendering are still timed
+            record_request(request, (time.perf_counter() - start) * 1000, profile, 500)
+            raise
+    total_ms = (time.perf_counter() - start) * 1000
+    record_request(request, total_ms, profile, response.status_code)
+
+    response.headers["Server-Timing"] = server_timing(total_ms, profile.phases)
+    if not explain or response.headers.get("content-type") != "application/json":
+        return response
+
+    body = json.loads(b"".join([chunk async for chunk in response.body_iterator]))
+    if isinstance(body, dict):
+        body["_profile"] = {"total_ms": round(total_ms, 3), "phases_ms": profile.phases, "queries": profile.queries}
+    headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+    return JSONResponse(body, status_code=response.status_code, headers=headers)
+
+
 @app.on_event("startup")
 def startup():
+    if slow_log := os.getenv("DATAFLOW_SLOW_QUERY_LOG"):
+        logger.add(slow_log, filter=lambda record: record["extra"].get("slow_query"), rotation="50 MB")
     if Path("data/warehouse.db").exists():
         logger.info("Warehouse found — API ready")
     else:
@@ -28,7 +83,7 @@ def root():
         "name": "DataFlow Analytics API",
         "version": "1.0.0",
         "docs": "/docs",
-        "endpoints": ["/summary", "/repos", "/events", "/activity", "/contributors"]
+        "endpoints": ["/summary", "/repos", "/repos/{owner}/{name}/related", "/events", "/activity", "/contributors", "/trending"]
     }
 
 
@@ -49,14 +104,38 @@ def summary():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def ranked_page(key: str, rows: list[dict], sort_by: str, page_size: int) -> dict:
+    # Keyset cursor: pass next_after_rank back as after_rank to fetch the next page
+    next_after_rank = rows[-1]["rank"] if len(rows) == page_size else None
+    return {key: rows, "count": len(rows), "sort_by": sort_by, "next_after_rank": next_after_rank}
+
+
 @app.get("/repos")
-def top_repos(limit: int = Query(default=10, ge=1, le=100)):
+def top_repos(
+    sort_by: str = Query(default="total_events", pattern=f"^({'|'.join(REPO_SORT_KEYS)})$"),
+    after_rank: int = Query(default=0, ge=0),
+    page_size: int = Query(default=10, ge=1, le=1000),
+    limit: int | None = Query(default=None, ge=1, le=1000, deprecated=True),
+):
+    page_size = limit or page_size
     try:
-        return {"repos": get_top_repos(limit), "count": limit}
+        return ranked_page("repos", get_top_repos(page_size, sort_by, after_rank), sort_by, page_size)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/repos/{owner}/{name}/related")
+def related_repos(owner: str, name: str, limit: int = Query(default=10, ge=1, le=50)):
+    repo_name = f"{owner}/{name}"
+    try:
+        related = get_related_repos(repo_name, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not related:
+        raise HTTPException(status_code=404, detail=f"No co-contribution data for {repo_name}")
+    return {"repo": repo_name, "related": related, "count": len(related)}
+
+
 @app.get("/events")
 def event_distribution():
     try:
@@ -74,13 +153,42 @@ def hourly_activity():
 
 
 @app.get("/contributors")
-def top_contributors(limit: int = Query(default=10, ge=1, le=100)):
+def top_contributors(
+    sort_by: str = Query(default="total_events", pattern=f"^({'|'.join(CONTRIBUTOR_SORT_KEYS)})$"),
+    after_rank: int = Query(default=0, ge=0),
+    page_size: int = Query(default=10, ge=1, le=1000),
+    limit: int | None = Query(default=None, ge=1, le=1000, deprecated=True),
+):
+    page_size = limit or page_size
+    try:
+        return ranked_page("contributors", get_top_contributors(page_size, sort_by, after_rank), sort_by, page_size)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/trending")
+def trending(
+    entity: str = Query(default="repo", pattern="^(repo|actor)$"),
+    limit: int = Query(default=10, ge=1, le=100),
+):
     try:
-        return {"contributors": get_top_contributors(limit), "count": limit}
+        rows = get_trending_contributors(limit) if entity == "actor" else get_trending_repos(limit)
+        return {"entity": entity, "trending": rows, "count": len(rows)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/debug/timings")
+def debug_timings():
+    return {"slow_query_ms": SLOW_QUERY_MS, "endpoints": timing_summary()}
+
+
+@app.delete("/debug/timings")
+def clear_debug_timings():
+    reset_timings()
+    return {"status": "ok"}
+
+
 @app.post("/warehouse/rebuild")
 def rebuild_warehouse():
     try:
@@ -0,0 +1,101 @@
+import os
+import sys
+import tomllib
+from dataclasses import dataclass, fields, replace
+from pathlib import Path
+from loguru import logger
+
+CONFIG_PATH = Path(os.getenv("DATAFLOW_CONFIG", "dataflow.toml"))
+ROLES = ("api", "pipeline", "dashboard")
+INT_FIELDS = {"duckdb_threads", "polars_max_threads", "polars_streaming_chunk_size"}
+
+
+@dataclass(frozen=True)
+class ResourceProfile:
+    duckdb_memory_limit: str
+    duckdb_threads: int
+    duckdb_temp_directory: str = "data/tmp/duckdb"
+    duckdb_max_temp_directory_size: str = "20GB"
+    polars_max_threads: int | None = None
+    polars_streaming_chunk_size: int | None = None
+    polars_temp_directory: str = "data/tmp/polars"
+
+
+# Sized so a backfill and the API can share one box: the API and dashboard keep
+# a small fixed budget, the pipeline gets the rest of the cores and spills to
+# disk instead of being OOM-killed
+_cpus = os.cpu_count() or 2
+DEFAULT_PROFILES = {
+    "api": ResourceProfile(duckdb_memory_limit="1GB", duckdb_threads=2),
+    "dashboard": ResourceProfile(duckdb_memory_limit="512MB", duckdb_threads=1),
+    "pipeline": ResourceProfile(
+        duckdb_memory_limit="4GB",
+        duckdb_threads=max(1, _cpus - 2),
+        polars_max_threads=max(1, _cpus - 2),
+        polars_streaming_chunk_size=50_000,
+    ),
+}
+
+_profile: ResourceProfile | None = None
+
+
+def load_profile(role: str) -> ResourceProfile:
+    if role not in ROLES:
+        raise ValueError(f"Unknown resource role: {role!r} (expected one of {ROLES})")
+    profile = DEFAULT_PROFILES[role]
+
+    # dataflow.toml: [resources.<role>] overrides defaults, env vars override the file
+    if CONFIG_PATH.exists():
+        with CONFIG_PATH.open("rb") as f:
+            file_overrides = tomllib.load(f).get("resources", {}).get(role, {})
+        unknown = set(file_overrides) - {f.name for f in fields(ResourceProfile)}
+        if unknown:
+            raise ValueError(f"Unknown keys in {CONFIG_PATH} [resources.{role}]: {sorted(unknown)}")
+        profile = replace(profile, **file_overrides)
+
+    env_overrides = {}
+    for field in fields(ResourceProfile):
+        env_name = f"DATAFLOW_{role.upper()}_{field.name.upper()}"
+        if env_name in os.environ:
+            value = os.environ[env_name]
+            env_overrides[field.name] = int(value) if field.name in INT_FIELDS else value
+    return replace(profile, **env_overrides)
+
+
+def set_role(role: str) -> ResourceProfile:
+    global _profile
+    _profile = load_profile(role)
+    configure_polars(_profile)
+    return _profile
+
+
+def current_profile() -> ResourceProfile:
+    global _profile
+    if _profile is None:
+        _profile = load_profile(os.getenv("DATAFLOW_ROLE", "pipeline"))
+    return _profile
+
+
+def duckdb_config(profile: ResourceProfile | None = None) -> dict:
+    profile = profile or current_profile()
+    # A temp directory lets DuckDB spill large joins/aggregations once memory_limit is hit
+    Path(profile.duckdb_temp_directory).mkdir(parents=True, exist_ok=True)
+    return {
+        "memory_limit": profile.duckdb_memory_limit,
+        "threads": profile.duckdb_threads,
+        "temp_directory": profile.duckdb_temp_directory,
+        "max_temp_directory_size": profile.duckdb_max_temp_directory_size,
+    }
+
+
+def configure_polars(profile: ResourceProfile) -> None:
+    # Polars sizes its thread pool once, at import time
+    if profile.polars_max_threads is not None:
+        if "polars" in sys.modules:
+            logger.warning("Polars already imported — polars_max_threads not applied to this process")
+        else:
+            os.environ["POLARS_MAX_THREADS"] = str(profile.polars_max_threads)
+    os.environ["POLARS_TEMP_DIR"] = profile.polars_temp_directory
+    # Read per query, so this applies even after import (same as pl.Config.set_streaming_chunk_size)
+    if profile.polars_streaming_chunk_size is not None:
+        os.environ["POLARS_STREAMING_CHUNK_SIZE"] = str(profile.polars_streaming_chunk_size)
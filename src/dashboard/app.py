@@ -3,10 +3,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
+from src.config.resources import set_role
+
+set_role("dashboard")
+
 from src.warehouse.db import (
     get_top_repos, get_event_distribution,
     get_hourly_activity, get_top_contributors,
-    get_summary_stats
+    get_summary_stats, get_trending_repos
 )
 
 st.set_page_config(
@@ -104,6 +108,31 @@ st.plotly_chart(fig3, use_container_width=True)
 
 st.divider()
 
+# ── Trending Repos ────────────────────────────────────────────────────────────
+st.subheader("Trending Repositories (24h vs prior 7d)")
+try:
+    trending_df = pd.DataFrame(get_trending_repos(15))
+except Exception:
+    trending_df = pd.DataFrame()
+
+if trending_df.empty:
+    st.info("No trending data yet — it builds up as silver hours land.")
+else:
+    fig_trend = px.bar(
+        trending_df,
+        x="trend_score",
+        y="repo_name",
+        orientation="h",
+        color="momentum_24h",
+        hover_data=["stars_24h", "forks_24h", "prs_24h", "baseline_daily"],
+        title="Top 15 Repos by Momentum",
+        color_continuous_scale="Reds"
+    )
+    fig_trend.update_layout(height=500, yaxis={"categoryorder": "total ascending"})
+    st.plotly_chart(fig_trend, use_container_width=True)
+
+st.divider()
+
 # ── Top Contributors ──────────────────────────────────────────────────────────
 st.subheader("Top Contributors")
 col1, col2 = st.columns(2)
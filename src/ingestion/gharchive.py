@@ -1,6 +1,8 @@
 import httpx
 import gzip
 import json
+import os
+import msgspec
 from pathlib import Path
 from datetime import datetime, timezone
 from loguru import logger
@@ -8,6 +10,23 @@ from tenacity import retry, stop_after_attempt, wait_fixed
 
 RAW_DATA_PATH = Path("data/raw")
 
+# payload paths projected into typed bronze columns (payload.pull_request.merged
+# → payload_pull_request_merged); override with DATAFLOW_PAYLOAD_FIELDS, "" disables
+DEFAULT_PAYLOAD_FIELDS = "payload.size:int,payload.action:str,payload.pull_request.merged:bool"
+PAYLOAD_TYPES = {"int": int, "float": float, "str": str, "bool": bool}
+
+
+class Actor(msgspec.Struct):
+    login: str | None = None
+
+
+class Repo(msgspec.Struct):
+    name: str | None = None
+
+
+class Org(msgspec.Struct):
+    login: str | None = None
+
 
 def get_gharchive_url(year: int, month: int, day: int, hour: int) -> str:
     return f"https://data.gharchive.org/{year}-{month:02d}-{day:02d}-{hour}.json.gz"
@@ -35,30 +54,132 @@ def download_hour(year: int, month: int, day: int, hour: int) -> Path:
     return output_path
 
 
-def parse_events(file_path: Path) -> list[dict]:
+def payload_fields(spec: str | None = None) -> dict[str, type]:
+    if spec is None:
+        spec = os.getenv("DATAFLOW_PAYLOAD_FIELDS", DEFAULT_PAYLOAD_FIELDS)
+    fields = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        path, _, type_name = item.partition(":")
+        if not path.startswith("payload.") or type_name not in PAYLOAD_TYPES:
+            raise ValueError(f"Invalid payload field {item!r} (expected payload.<path>:<{'|'.join(PAYLOAD_TYPES)}>)")
+        fields[path] = PAYLOAD_TYPES[type_name]
+    return fields
+
+
+def payload_column(path: str) -> str:
+    return path.replace(".", "_")
+
+
+def payload_struct(name: str, tree: dict) -> type:
+    return msgspec.defstruct(name, [
+        (key, (payload_struct(f"{name}_{key}", sub) if isinstance(sub, dict) else sub) | None, None)
+        for key, sub in tree.items()
+    ])
+
+
+def event_decoder(fields: dict[str, type]) -> msgspec.json.Decoder:
+    tree = {}
+    for path, field_type in fields.items():
+        *parents, leaf = path.split(".")
+        node = tree
+        for key in parents:
+            node = node.setdefault(key, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Payload field {path!r} nests under another requested field")
+        node[leaf] = field_type
+
+    # Only the declared keys are decoded; the rest of the line (most of payload:
+    # commit lists, full PR/issue objects) is skipped without building Python objects
+    event = msgspec.defstruct("Event", [
+        ("id", str | None, None),
+        ("type", str | None, None),
+        ("actor", Actor | None, None),
+        ("repo", Repo | None, None),
+        ("created_at", str | None, None),
+        ("public", bool | None, True),
+        ("org", Org | None, None),
+        *([("payload", payload_struct("Payload", tree["payload"]) | None, None)] if tree else []),
+    ])
+    return msgspec.json.Decoder(event)
+
+
+def lookup(obj, keys: list[str]):
+    for key in keys:
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, msgspec.Struct):
+            obj = getattr(obj, key)
+        else:
+            # Missing or not an object (e.g. "pull_request": "x" in an odd payload)
+            return None
+    return obj
+
+
+def parse_event_fallback(line: bytes, fields: dict[str, type]) -> dict | None:
+    # Lines that don't match the typed decoder: full decode, mismatched or
+    # oddly shaped values become null instead of dropping the event
+    event = json.loads(line)
+    if not isinstance(event, dict):
+        return None
+    row = {
+        "id": event.get("id"),
+        "type": event.get("type"),
+        "actor_login": lookup(event, ["actor", "login"]),
+        "repo_name": lookup(event, ["repo", "name"]),
+        "created_at": event.get("created_at"),
+        "public": event.get("public", True),
+        "org": lookup(event, ["org", "login"]),
+    }
+    for path, field_type in fields.items():
+        value = lookup(event, path.split("."))
+        # Same coercion as the typed decoder: ints are valid floats, bools are never numbers
+        if field_type is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        valid = isinstance(value, field_type) and (field_type is bool or not isinstance(value, bool))
+        row[payload_column(path)] = value if valid else None
+    return row
+
+
+def parse_events(file_path: Path, fields: dict[str, type] | None = None) -> list[dict]:
+    fields = payload_fields() if fields is None else fields
+    decoder = event_decoder(fields)
+    paths = [(payload_column(path), path.split(".")) for path in fields]
     events = []
-    with gzip.open(file_path, "rt", encoding="utf-8") as f:
+    fallbacks = 0
+    with gzip.open(file_path, "rb") as f:
         for line in f:
             try:
-                event = json.loads(line.strip())
-                events.append({
-                    "id": event.get("id"),
-                    "type": event.get("type"),
-                    "actor_login": event.get("actor", {}).get("login"),
-                    "repo_name": event.get("repo", {}).get("name"),
-                    "created_at": event.get("created_at"),
-                    "public": event.get("public", True),
-                    "org": event.get("org", {}).get("login") if event.get("org") else None,
-                })
-            except json.JSONDecodeError:
+                event = decoder.decode(line)
+            except msgspec.ValidationError:
+                try:
+                    row = parse_event_fallback(line, fields)
+                except json.JSONDecodeError:
+                    continue
+                if row is not None:
+                    events.append(row)
+                    fallbacks += 1
+                continue
+            except msgspec.DecodeError:
                 continue
-    logger.info(f"Parsed {len(events)} events from {file_path.name}")
+            row = {
+                "id": event.id,
+                "type": event.type,
+                "actor_login": event.actor.login if event.actor else None,
+                "repo_name": event.repo.name if event.repo else None,
+                "created_at": event.created_at,
+                "public": event.public,
+                "org": event.org.login if event.org else None,
+            }
+            for column, keys in paths:
+                row[column] = lookup(event, keys)
+            events.append(row)
+    logger.info(f"Parsed {len(events)} events from {file_path.name} ({len(fields)} payload fields, {fallbacks} full decodes)")
     return events
 
 
-def ingest_hour(year: int, month: int, day: int, hour: int) -> list[dict]:
+def ingest_hour(year: int, month: int, day: int, hour: int, fields: dict[str, type] | None = None) -> list[dict]:
     file_path = download_hour(year, month, day, hour)
-    return parse_events(file_path)
+    return parse_events(file_path, fields)
 
 
 if __name__ == "__main__":
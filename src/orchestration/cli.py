@@ -0,0 +1,218 @@
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Keep this module's top-level imports to the standard library: every subcommand
+# imports only the pipeline stage it runs, so `dataflow --help` or a single-hour
+# cron job never pays for Prefect, DuckDB or modules it does not touch.
+
+FLOW_PATH = Path(__file__).resolve().parents[2] / "flows" / "etl_flow.py"
+GOLD_ENGINES = ("polars", "duckdb")
+
+
+def parse_hour(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DDTHH, got {value!r}")
+
+
+def parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+
+
+def hour_args(args: argparse.Namespace) -> tuple[int, int, int, int]:
+    return args.date.year, args.date.month, args.date.day, args.hour
+
+
+def cmd_ingest(args: argparse.Namespace) -> dict:
+    from src.ingestion.gharchive import download_hour
+    path = download_hour(*hour_args(args))
+    return {"raw": str(path)}
+
+
+def cmd_bronze(args: argparse.Namespace) -> dict:
+    from src.pipeline.bronze import to_bronze
+    return {"bronze": len(to_bronze(*hour_args(args)))}
+
+
+def cmd_silver(args: argparse.Namespace) -> dict:
+    from src.pipeline.silver import to_silver
+    return {"silver": len(to_silver(*hour_args(args)))}
+
+
+def run_gold(engine: str, export_parquet: bool, year: int, month: int, day: int, hour: int) -> dict[str, int]:
+    if engine == "duckdb":
+        # Materializes straight into the warehouse; no Polars frames to hand back
+        from src.pipeline.gold_sql import to_gold_duckdb
+        return to_gold_duckdb(year, month, day, hour, export_parquet=export_parquet)
+    from src.pipeline.gold import to_gold
+    return {k: len(v) for k, v in to_gold(year, month, day, hour).items()}
+
+
+def cmd_gold(args: argparse.Namespace) -> dict:
+    return {"gold": run_gold(args.engine, args.export_parquet, *hour_args(args))}
+
+
+def cmd_similarity(args: argparse.Namespace) -> dict:
+    from src.pipeline.similarity import to_repo_similarity
+    return {"repo_similarity": len(to_repo_similarity(*hour_args(args)))}
+
+
+def cmd_trending(args: argparse.Namespace) -> dict:
+    from src.pipeline.trending import update_trending
+    return {table: len(df) for table, df in update_trending(*hour_args(args)).items()}
+
+
+def cmd_warehouse(args: argparse.Namespace) -> dict:
+    from src.warehouse.db import build_warehouse
+    build_warehouse()
+    return {"warehouse": "built"}
+
+
+def cmd_compact(args: argparse.Namespace) -> dict:
+    from src.pipeline.bronze import BRONZE_PATH
+    from src.pipeline.silver import SILVER_PATH
+    from src.pipeline.layout import compact_layer
+    return {layer.name: compact_layer(layer, args.period) for layer in (BRONZE_PATH, SILVER_PATH)}
+
+
+def load_prefect_flow():
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("etl_flow", FLOW_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.etl_flow
+
+
+def cmd_backfill(args: argparse.Namespace) -> dict:
+    if args.end < args.start:
+        raise SystemExit("dataflow backfill: --end must not be before --start")
+    hours = []
+    current = args.start
+    while current <= args.end:
+        hours.append(current)
+        current += timedelta(hours=1)
+
+    if args.backend == "prefect":
+        etl_flow = load_prefect_flow()
+        summary = {
+            f"{h:%Y-%m-%dT%H}": etl_flow(h.year, h.month, h.day, h.hour,
+                                         engine=args.engine, export_parquet=args.export_parquet)
+            for h in hours
+        }
+        if not args.skip_warehouse:
+            from src.pipeline.gold_sql import GOLD_TABLES
+            from src.warehouse.db import build_warehouse
+            build_warehouse(GOLD_TABLES if args.engine == "duckdb" else ())
+            summary["warehouse"] = "built"
+        return summary
+
+    from src.orchestration.runner import Task, run_parallel, run_task
+    from src.pipeline.bronze import to_bronze
+    from src.pipeline.silver import to_silver
+    from src.pipeline.similarity import to_repo_similarity
+    from src.pipeline.trending import update_trending
+
+    # Retry policy mirrors the Prefect tasks in flows/etl_flow.py
+    chains = {
+        f"{h:%Y-%m-%dT%H}": [
+            Task("ingest-to-bronze", lambda *a: len(to_bronze(*a)), (h.year, h.month, h.day, h.hour),
+                 retries=args.retries, retry_delay_seconds=10),
+            Task("transform-to-silver", lambda *a: len(to_silver(*a)), (h.year, h.month, h.day, h.hour),
+                 retries=min(args.retries, 2), retry_delay_seconds=5),
+        ]
+        for h in hours
+    }
+    results, failures = run_parallel(chains, max_workers=args.workers)
+    summary = {key: {"bronze": counts[0], "silver": counts[1]} for key, counts in sorted(results.items())}
+    if failures:
+        for key, error in sorted(failures.items()):
+            print(f"{key}: FAILED — {error}", file=sys.stderr)
+        summary["failed"] = sorted(failures)
+        return summary
+
+    # Trending windows slide one hour at a time, so they advance in order
+    for h in hours:
+        trending = run_task(Task("update-trending", update_trending, (h.year, h.month, h.day, h.hour)))
+    summary["trending"] = {table: len(df) for table, df in trending.items()}
+
+    # Gold tables describe a single hour and are overwritten, so only the latest
+    # hour of the range is aggregated, followed by one warehouse rebuild
+    last = hours[-1]
+    gold = run_task(Task("aggregate-to-gold", run_gold, (
+        args.engine, args.export_parquet, last.year, last.month, last.day, last.hour
+    )))
+    summary["gold"] = dict(gold)
+    similarity = run_task(Task("build-repo-similarity", to_repo_similarity,
+                               (last.year, last.month, last.day, last.hour)))
+    summary["gold"]["repo_similarity"] = len(similarity)
+    if not args.skip_warehouse:
+        from src.warehouse.db import build_warehouse
+        # The DuckDB engine has already materialized its tables in the warehouse
+        skip = tuple(gold) if args.engine == "duckdb" else ()
+        run_task(Task("build-warehouse", build_warehouse, (skip,)))
+        summary["warehouse"] = "built"
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="dataflow", description="DataFlow ELT pipeline runner")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_hour_command(name: str, handler, help_text: str):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--date", type=parse_date, default=parse_date("2024-01-01"), help="YYYY-MM-DD")
+        sub.add_argument("--hour", type=int, choices=range(24), default=0, metavar="HOUR")
+        sub.set_defaults(handler=handler)
+        return sub
+
+    def add_engine_options(sub: argparse.ArgumentParser):
+        sub.add_argument("--engine", choices=GOLD_ENGINES, default=os.getenv("DATAFLOW_GOLD_ENGINE", "polars"),
+                         help="polars: aggregate in Polars, write Parquet; duckdb: SQL over silver into the warehouse")
+        sub.add_argument("--export-parquet", action="store_true", help="duckdb engine: also write gold Parquet")
+
+    add_hour_command("ingest", cmd_ingest, "Download one GH Archive hour")
+    add_hour_command("bronze", cmd_bronze, "Build the bronze layer for one hour")
+    add_hour_command("silver", cmd_silver, "Build the silver layer for one hour")
+    add_engine_options(add_hour_command("gold", cmd_gold, "Build the gold layer for one hour"))
+    add_hour_command("trending", cmd_trending, "Slide the trending windows forward to one silver hour")
+    add_hour_command("similarity", cmd_similarity, "Build the repo co-contribution table for one hour")
+
+    warehouse = subparsers.add_parser("warehouse", help="Build the DuckDB warehouse from gold")
+    warehouse.set_defaults(handler=cmd_warehouse)
+
+    compact = subparsers.add_parser("compact", help="Merge hourly bronze/silver files")
+    compact.add_argument("--period", choices=["day", "week"], default="day")
+    compact.set_defaults(handler=cmd_compact)
+
+    backfill = subparsers.add_parser("backfill", help="Run bronze/silver for a range of hours, then gold + warehouse")
+    backfill.add_argument("--start", type=parse_hour, required=True, help="YYYY-MM-DDTHH")
+    backfill.add_argument("--end", type=parse_hour, required=True, help="YYYY-MM-DDTHH (inclusive)")
+    backfill.add_argument("--workers", type=int, default=4)
+    backfill.add_argument("--retries", type=int, default=3)
+    backfill.add_argument("--backend", choices=["inprocess", "prefect"], default="inprocess")
+    backfill.add_argument("--skip-warehouse", action="store_true")
+    add_engine_options(backfill)
+    backfill.set_defaults(handler=cmd_backfill)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    # Before any subcommand imports Polars, which sizes its thread pool on import
+    from src.config.resources import set_role
+    set_role("pipeline")
+    result = args.handler(args)
+    print(result)
+    return 1 if isinstance(result, dict) and result.get("failed") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
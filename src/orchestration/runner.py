@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable
+from loguru import logger
+
+
+@dataclass
+class Task:
+    name: str
+    fn: Callable[..., Any]
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+    retries: int = 0
+    retry_delay_seconds: float = 0
+
+
+def run_task(task: Task) -> Any:
+    for attempt in range(task.retries + 1):
+        try:
+            start = time.perf_counter()
+            result = task.fn(*task.args, **task.kwargs)
+            logger.info(f"Task {task.name} finished in {time.perf_counter() - start:.2f}s")
+            return result
+        except Exception as e:
+            if attempt == task.retries:
+                logger.error(f"Task {task.name} failed after {attempt + 1} attempt(s): {e}")
+                raise
+            logger.warning(f"Task {task.name} failed ({e}) — retry {attempt + 1}/{task.retries} "
+                           f"in {task.retry_delay_seconds}s")
+            time.sleep(task.retry_delay_seconds)
+
+
+def run_chain(tasks: list[Task]) -> list[Any]:
+    return [run_task(task) for task in tasks]
+
+
+def run_parallel(chains: dict[str, list[Task]], max_workers: int = 4) -> tuple[dict[str, list[Any]], dict[str, Exception]]:
+    # Chains run concurrently; tasks within a chain run in order. Polars and DuckDB
+    # release the GIL and downloads are I/O bound, so threads are enough here.
+    results, failures = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(run_chain, tasks): key for key, tasks in chains.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                failures[key] = e
+    return results, failures
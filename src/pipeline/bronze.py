@@ -2,27 +2,34 @@ import polars as pl
 from pathlib import Path
 from loguru import logger
 from datetime import timezone
-from src.ingestion.gharchive import ingest_hour
+from src.ingestion.gharchive import ingest_hour, payload_column, payload_fields
+from src.pipeline.layout import write_parquet
 
 BRONZE_PATH = Path("data/bronze")
+PAYLOAD_DTYPES = {int: pl.Int64, float: pl.Float64, str: pl.Utf8, bool: pl.Boolean}
 
 
 def to_bronze(year: int, month: int, day: int, hour: int) -> pl.DataFrame:
     logger.info(f"Building bronze layer for {year}-{month:02d}-{day:02d} hour {hour}...")
     
-    events = ingest_hour(year, month, day, hour)
-    
-    df = pl.DataFrame(events).with_columns([
+    fields = payload_fields()
+    events = ingest_hour(year, month, day, hour, fields)
+
+    # Payload columns are mostly null, so declare their types rather than infer them
+    payload_schema = {payload_column(path): PAYLOAD_DTYPES[field_type] for path, field_type in fields.items()}
+    df = pl.DataFrame(events, schema_overrides=payload_schema)
+    df = df.with_columns([
         pl.col("created_at").str.to_datetime(format="%Y-%m-%dT%H:%M:%SZ", time_unit="us").alias("created_at"),
         pl.col("id").cast(pl.Utf8),
         pl.col("public").cast(pl.Boolean),
         pl.lit(f"{year}-{month:02d}-{day:02d}").alias("date"),
         pl.lit(hour).cast(pl.Int32).alias("hour"),
+        *[pl.lit(None, dtype).alias(column) for column, dtype in payload_schema.items() if column not in df.columns],
     ])
 
     BRONZE_PATH.mkdir(parents=True, exist_ok=True)
     output_path = BRONZE_PATH / f"{year}-{month:02d}-{day:02d}-{hour}.parquet"
-    df.write_parquet(output_path)
+    write_parquet(df, output_path)
 
     logger.info(f"Bronze: {len(df)} rows → {output_path}")
     return df
@@ -1,93 +1,101 @@
 import polars as pl
-import duckdb
 from pathlib import Path
 from loguru import logger
+from src.pipeline.layout import GOLD_LAYOUT, scan_hour, write_parquet
+from src.pipeline.ranking import CONTRIBUTOR_SORT_KEYS, REPO_SORT_KEYS
 
 SILVER_PATH = Path("data/silver")
 GOLD_PATH = Path("data/gold")
 
 
+def with_ranks(df: pl.DataFrame, sort_keys: tuple[str, ...], tiebreak: str) -> pl.DataFrame:
+    # One dense 1..N ordinal per sort key (ties broken by name), so a page is a
+    # `<key>_rank` range filter rather than an OFFSET scan. Rows are stored in
+    # total_events order, so only that rank is clustered; other keys filter the table
+    return df.with_columns([
+        (pl.arg_sort_by([key, tiebreak], descending=[True, False]).arg_sort() + 1).cast(pl.UInt32).alias(f"{key}_rank")
+        for key in sort_keys
+    ]).sort(f"{sort_keys[0]}_rank")
+
+
 def to_gold(year: int, month: int, day: int, hour: int) -> dict[str, pl.DataFrame]:
     logger.info(f"Building gold layer for {year}-{month:02d}-{day:02d} hour {hour}...")
 
-    silver_path = SILVER_PATH / f"{year}-{month:02d}-{day:02d}-{hour}.parquet"
-    df = pl.read_parquet(silver_path)
+    lf = scan_hour(SILVER_PATH, year, month, day, hour)
 
     GOLD_PATH.mkdir(parents=True, exist_ok=True)
 
-    # Gold 1 — Top repos by activity
-    top_repos = (
-        df.group_by("repo_name")
-        .agg([
-            pl.len().alias("total_events"),
-            pl.col("type").filter(pl.col("type") == "PushEvent").len().alias("push_count"),
-            pl.col("type").filter(pl.col("type") == "WatchEvent").len().alias("star_count"),
-            pl.col("type").filter(pl.col("type") == "ForkEvent").len().alias("fork_count"),
-            pl.col("type").filter(pl.col("type") == "PullRequestEvent").len().alias("pr_count"),
-            pl.col("actor_login").n_unique().alias("unique_contributors"),
-        ])
-        .sort("total_events", descending=True)
-        .head(100)
-    )
-    top_repos.write_parquet(GOLD_PATH / "top_repos.parquet")
-    logger.info(f"Gold top_repos: {len(top_repos)} rows")
-
-    # Gold 2 — Event type distribution
-    event_distribution = (
-        df.group_by(["type", "event_category"])
-        .agg(pl.len().alias("count"))
-        .sort("count", descending=True)
-    )
-    event_distribution.write_parquet(GOLD_PATH / "event_distribution.parquet")
-    logger.info(f"Gold event_distribution: {len(event_distribution)} rows")
-
-    # Gold 3 — Activity by hour of day
-    hourly_activity = (
-        df.group_by("hour_of_day")
-        .agg([
-            pl.len().alias("total_events"),
-            pl.col("type").filter(pl.col("type") == "PushEvent").len().alias("push_count"),
-            pl.col("actor_login").n_unique().alias("unique_actors"),
-        ])
-        .sort("hour_of_day")
-    )
-    hourly_activity.write_parquet(GOLD_PATH / "hourly_activity.parquet")
-    logger.info(f"Gold hourly_activity: {len(hourly_activity)} rows")
+    queries = {
+        # Gold 1 — Full repo ranking by activity
+        "top_repos": (
+            lf.group_by("repo_name")
+            .agg([
+                pl.len().alias("total_events"),
+                pl.col("type").filter(pl.col("type") == "PushEvent").len().alias("push_count"),
+                pl.col("type").filter(pl.col("type") == "WatchEvent").len().alias("star_count"),
+                pl.col("type").filter(pl.col("type") == "ForkEvent").len().alias("fork_count"),
+                pl.col("type").filter(pl.col("type") == "PullRequestEvent").len().alias("pr_count"),
+                pl.col("actor_login").n_unique().alias("unique_contributors"),
+                pl.col("push_commits").sum().alias("commit_count"),
+                pl.col("is_pr_closed").sum().alias("pr_closed_count"),
+                pl.col("is_pr_merged").sum().alias("pr_merged_count"),
+            ])
+            .with_columns(
+                pl.when(pl.col("pr_closed_count") > 0)
+                .then(pl.col("pr_merged_count") / pl.col("pr_closed_count"))
+                .alias("pr_merged_rate")
+            )
+        ),
+        # Gold 2 — Event type distribution
+        "event_distribution": (
+            lf.group_by(["type", "event_category"])
+            .agg(pl.len().alias("count"))
+            .sort(["count", "type"], descending=[True, False])
+        ),
+        # Gold 3 — Activity by hour of day
+        "hourly_activity": (
+            lf.group_by("hour_of_day")
+            .agg([
+                pl.len().alias("total_events"),
+                pl.col("type").filter(pl.col("type") == "PushEvent").len().alias("push_count"),
+                pl.col("actor_login").n_unique().alias("unique_actors"),
+            ])
+            .sort("hour_of_day")
+        ),
+        # Gold 4 — Full contributor ranking
+        "top_contributors": (
+            lf.group_by("actor_login")
+            .agg([
+                pl.len().alias("total_events"),
+                pl.col("repo_name").n_unique().alias("unique_repos"),
+                pl.col("type").filter(pl.col("type") == "PushEvent").len().alias("push_count"),
+                pl.col("is_org_event").sum().alias("org_events"),
+                pl.col("push_commits").sum().alias("commit_count"),
+            ])
+        ),
+        # Gold 5 — Org vs personal activity
+        "org_summary": (
+            lf.group_by("is_org_event")
+            .agg([
+                pl.len().alias("total_events"),
+                pl.col("actor_login").n_unique().alias("unique_actors"),
+                pl.col("repo_name").n_unique().alias("unique_repos"),
+            ])
+            .sort("is_org_event")
+        ),
+    }
 
-    # Gold 4 — Top contributors
-    top_contributors = (
-        df.group_by("actor_login")
-        .agg([
-            pl.len().alias("total_events"),
-            pl.col("repo_name").n_unique().alias("unique_repos"),
-            pl.col("type").filter(pl.col("type") == "PushEvent").len().alias("push_count"),
-            pl.col("is_org_event").sum().alias("org_events"),
-        ])
-        .sort("total_events", descending=True)
-        .head(100)
-    )
-    top_contributors.write_parquet(GOLD_PATH / "top_contributors.parquet")
-    logger.info(f"Gold top_contributors: {len(top_contributors)} rows")
+    # Run together so the silver scan (only the columns used above) is read once
+    # and shared; the streaming engine would rescan silver for every table
+    gold = dict(zip(queries, pl.collect_all(list(queries.values()))))
+    gold["top_repos"] = with_ranks(gold["top_repos"], REPO_SORT_KEYS, "repo_name")
+    gold["top_contributors"] = with_ranks(gold["top_contributors"], CONTRIBUTOR_SORT_KEYS, "actor_login")
 
-    # Gold 5 — Org vs personal activity
-    org_summary = (
-        df.group_by("is_org_event")
-        .agg([
-            pl.len().alias("total_events"),
-            pl.col("actor_login").n_unique().alias("unique_actors"),
-            pl.col("repo_name").n_unique().alias("unique_repos"),
-        ])
-    )
-    org_summary.write_parquet(GOLD_PATH / "org_summary.parquet")
-    logger.info(f"Gold org_summary: {len(org_summary)} rows")
+    for table_name, df in gold.items():
+        write_parquet(df, GOLD_PATH / f"{table_name}.parquet", GOLD_LAYOUT)
+        logger.info(f"Gold {table_name}: {len(df)} rows")
 
-    return {
-        "top_repos": top_repos,
-        "event_distribution": event_distribution,
-        "hourly_activity": hourly_activity,
-        "top_contributors": top_contributors,
-        "org_summary": org_summary,
-    }
+    return gold
 
 
 if __name__ == "__main__":
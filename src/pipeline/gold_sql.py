@@ -0,0 +1,127 @@
+from pathlib import Path
+from loguru import logger
+from src.pipeline.ranking import CONTRIBUTOR_SORT_KEYS, REPO_SORT_KEYS
+from src.pipeline.layout import GOLD_LAYOUT, ParquetLayout, hour_source
+from src.warehouse.db import get_connection
+
+SILVER_PATH = Path("data/silver")
+GOLD_PATH = Path("data/gold")
+
+GOLD_TABLES = ("top_repos", "event_distribution", "hourly_activity", "top_contributors", "org_summary")
+
+
+def rank_columns(sort_keys: tuple[str, ...], tiebreak: str) -> str:
+    # Same dense 1..N ordinals as gold.with_ranks
+    return ",\n".join(
+        f"CAST(ROW_NUMBER() OVER (ORDER BY {key} DESC, {tiebreak}) AS UINTEGER) AS {key}_rank"
+        for key in sort_keys
+    )
+
+
+# Casts mirror the Polars engine's dtypes (pl.len() → UInt32, dt.hour() → Int8)
+# so both engines produce identical warehouse tables
+GOLD_SQL = {
+    "top_repos": f"""
+        SELECT *, pr_merged_count / NULLIF(pr_closed_count, 0) AS pr_merged_rate,
+               {rank_columns(REPO_SORT_KEYS, "repo_name")}
+        FROM (
+            SELECT repo_name,
+                   CAST(COUNT(*) AS UINTEGER) AS total_events,
+                   CAST(COUNT(*) FILTER (WHERE type = 'PushEvent') AS UINTEGER) AS push_count,
+                   CAST(COUNT(*) FILTER (WHERE type = 'WatchEvent') AS UINTEGER) AS star_count,
+                   CAST(COUNT(*) FILTER (WHERE type = 'ForkEvent') AS UINTEGER) AS fork_count,
+                   CAST(COUNT(*) FILTER (WHERE type = 'PullRequestEvent') AS UINTEGER) AS pr_count,
+                   CAST(COUNT(DISTINCT actor_login) AS UINTEGER) AS unique_contributors,
+                   CAST(COALESCE(SUM(push_commits), 0) AS BIGINT) AS commit_count,
+                   CAST(COUNT(*) FILTER (WHERE is_pr_closed) AS UINTEGER) AS pr_closed_count,
+                   CAST(COUNT(*) FILTER (WHERE is_pr_merged) AS UINTEGER) AS pr_merged_count
+            FROM silver
+            GROUP BY repo_name
+        )
+        ORDER BY total_events_rank
+    """,
+    "event_distribution": """
+        SELECT type, event_category, CAST(COUNT(*) AS UINTEGER) AS count
+        FROM silver
+        GROUP BY type, event_category
+        ORDER BY count DESC, type
+    """,
+    "hourly_activity": """
+        SELECT CAST(hour_of_day AS TINYINT) AS hour_of_day,
+               CAST(COUNT(*) AS UINTEGER) AS total_events,
+               CAST(COUNT(*) FILTER (WHERE type = 'PushEvent') AS UINTEGER) AS push_count,
+               CAST(COUNT(DISTINCT actor_login) AS UINTEGER) AS unique_actors
+        FROM silver
+        GROUP BY hour_of_day
+        ORDER BY hour_of_day
+    """,
+    "top_contributors": f"""
+        SELECT *, {rank_columns(CONTRIBUTOR_SORT_KEYS, "actor_login")}
+        FROM (
+            SELECT actor_login,
+                   CAST(COUNT(*) AS UINTEGER) AS total_events,
+                   CAST(COUNT(DISTINCT repo_name) AS UINTEGER) AS unique_repos,
+                   CAST(COUNT(*) FILTER (WHERE type = 'PushEvent') AS UINTEGER) AS push_count,
+                   CAST(COUNT(*) FILTER (WHERE is_org_event) AS UINTEGER) AS org_events,
+                   CAST(COALESCE(SUM(push_commits), 0) AS BIGINT) AS commit_count
+            FROM silver
+            GROUP BY actor_login
+        )
+        ORDER BY total_events_rank
+    """,
+    "org_summary": """
+        SELECT is_org_event,
+               CAST(COUNT(*) AS UINTEGER) AS total_events,
+               CAST(COUNT(DISTINCT actor_login) AS UINTEGER) AS unique_actors,
+               CAST(COUNT(DISTINCT repo_name) AS UINTEGER) AS unique_repos
+        FROM silver
+        GROUP BY is_org_event
+        ORDER BY is_org_event
+    """,
+}
+
+
+def copy_options(layout: ParquetLayout) -> str:
+    options = ["FORMAT PARQUET", f"COMPRESSION {layout.compression}", f"ROW_GROUP_SIZE {layout.row_group_size}"]
+    # DuckDB only accepts a level for zstd
+    if layout.compression == "zstd" and layout.compression_level is not None:
+        options.append(f"COMPRESSION_LEVEL {layout.compression_level}")
+    return ", ".join(options)
+
+
+def to_gold_duckdb(year: int, month: int, day: int, hour: int, export_parquet: bool = False) -> dict[str, int]:
+    logger.info(f"Building gold layer in DuckDB for {year}-{month:02d}-{day:02d} hour {hour}...")
+
+    path, compacted = hour_source(SILVER_PATH, year, month, day, hour)
+    hour_filter = f"WHERE date = '{year}-{month:02d}-{day:02d}' AND hour = {hour}" if compacted else ""
+
+    conn = get_connection()
+    counts = {}
+    try:
+        conn.execute(f"CREATE OR REPLACE TEMP VIEW silver AS SELECT * FROM read_parquet('{path}') {hour_filter}")
+        # One transaction, so API readers never see a mix of old and new gold tables
+        conn.execute("BEGIN TRANSACTION")
+        for table_name, sql in GOLD_SQL.items():
+            conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS {sql}")
+            counts[table_name] = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            logger.info(f"Gold {table_name}: {counts[table_name]} rows")
+        conn.execute("COMMIT")
+
+        GOLD_PATH.mkdir(parents=True, exist_ok=True)
+        for table_name in GOLD_TABLES:
+            parquet_path = GOLD_PATH / f"{table_name}.parquet"
+            if export_parquet:
+                conn.execute(f"COPY {table_name} TO '{parquet_path}' ({copy_options(GOLD_LAYOUT)})")
+            elif parquet_path.exists():
+                # The warehouse now holds the fresh tables; a stale file would
+                # overwrite them on the next build_warehouse()
+                parquet_path.unlink()
+                logger.info(f"Removed stale {parquet_path} (DuckDB engine, no Parquet export)")
+    finally:
+        conn.close()
+
+    return counts
+
+
+if __name__ == "__main__":
+    print(to_gold_duckdb(2024, 1, 1, 0, export_parquet=True))
@@ -0,0 +1,141 @@
+import os
+import polars as pl
+from dataclasses import dataclass, replace
+from datetime import date
+from pathlib import Path
+from loguru import logger
+
+HOURLY_GLOB = "????-??-??-*.parquet"
+DAILY_GLOB = "????-??-??.parquet"
+COMPACTION_PERIODS = ("day", "week")
+
+
+@dataclass(frozen=True)
+class ParquetLayout:
+    compression: str = "zstd"
+    compression_level: int | None = 3
+    row_group_size: int = 122_880
+    # Clustering on these keys keeps row-group min/max statistics narrow,
+    # so filters on repo_name / created_at can skip most of a file
+    sort_keys: tuple[str, ...] = ("repo_name", "created_at")
+
+
+def layout_from_env(**overrides) -> ParquetLayout:
+    layout = ParquetLayout(
+        compression=os.getenv("DATAFLOW_PARQUET_COMPRESSION", ParquetLayout.compression),
+        compression_level=int(os.getenv("DATAFLOW_PARQUET_COMPRESSION_LEVEL", ParquetLayout.compression_level)),
+        row_group_size=int(os.getenv("DATAFLOW_PARQUET_ROW_GROUP_SIZE", ParquetLayout.row_group_size)),
+    )
+    if "DATAFLOW_PARQUET_SORT_KEYS" in os.environ:
+        keys = os.environ["DATAFLOW_PARQUET_SORT_KEYS"].split(",")
+        layout = replace(layout, sort_keys=tuple(k.strip() for k in keys if k.strip()))
+    return replace(layout, **overrides)
+
+
+# Bronze/silver are event-level and clustered; gold tables keep their ranking order
+EVENT_LAYOUT = layout_from_env()
+GOLD_LAYOUT = layout_from_env(sort_keys=())
+
+
+def write_parquet(df: pl.DataFrame, path: Path, layout: ParquetLayout = EVENT_LAYOUT) -> None:
+    sort_keys = [k for k in layout.sort_keys if k in df.columns]
+    if sort_keys:
+        df = df.sort(sort_keys)
+
+    # Write next to the target and swap in, so readers never see a partial file
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    df.write_parquet(
+        tmp_path,
+        compression=layout.compression,
+        compression_level=layout.compression_level,
+        row_group_size=layout.row_group_size,
+        statistics=True,
+    )
+    tmp_path.replace(path)
+
+
+def period_stem(day: date, period: str) -> str:
+    if period == "day":
+        return day.isoformat()
+    if period == "week":
+        iso_year, iso_week, _ = day.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    raise ValueError(f"Unknown compaction period: {period!r} (expected one of {COMPACTION_PERIODS})")
+
+
+def hour_filter(year: int, month: int, day: int, hour: int) -> pl.Expr:
+    return (pl.col("date") == f"{year}-{month:02d}-{day:02d}") & (pl.col("hour") == hour)
+
+
+def hour_source(layer_path: Path, year: int, month: int, day: int, hour: int) -> tuple[Path, bool]:
+    hourly_path = layer_path / f"{year}-{month:02d}-{day:02d}-{hour}.parquet"
+    if hourly_path.exists():
+        return hourly_path, False
+
+    # Hours that have been compacted away are served from the finest daily/weekly
+    # file that holds them (a daily file can sit next to a weekly one for the same
+    # week), which then needs a date/hour filter
+    for period in COMPACTION_PERIODS:
+        compacted_path = layer_path / f"{period_stem(date(year, month, day), period)}.parquet"
+        if compacted_path.exists() and (
+            pl.scan_parquet(compacted_path).filter(hour_filter(year, month, day, hour)).select(pl.len()).collect().item()
+        ):
+            return compacted_path, True
+
+    raise FileNotFoundError(f"No data for {year}-{month:02d}-{day:02d} hour {hour} in {layer_path}")
+
+
+def scan_hour(layer_path: Path, year: int, month: int, day: int, hour: int) -> pl.LazyFrame:
+    path, compacted = hour_source(layer_path, year, month, day, hour)
+    lf = pl.scan_parquet(path)
+    return lf.filter(hour_filter(year, month, day, hour)) if compacted else lf
+
+
+def read_hour(layer_path: Path, year: int, month: int, day: int, hour: int) -> pl.DataFrame:
+    return scan_hour(layer_path, year, month, day, hour).collect(streaming=True)
+
+
+def compact_layer(layer_path: Path, period: str = "day", layout: ParquetLayout = EVENT_LAYOUT) -> dict[str, int]:
+    logger.info(f"Compacting {layer_path} into {period} files...")
+
+    # Coarsest first: each later source overrides the hours it contains
+    sources = sorted(layer_path.glob(DAILY_GLOB)) if period == "week" else []
+    sources += sorted(layer_path.glob(HOURLY_GLOB))
+
+    groups: dict[str, list[Path]] = {}
+    for path in sources:
+        stem = period_stem(date.fromisoformat(path.stem[:10]), period)
+        groups.setdefault(stem, []).append(path)
+
+    compacted = {}
+    for stem, paths in sorted(groups.items()):
+        target = layer_path / f"{stem}.parquet"
+        layers = ([target] if target.exists() else []) + paths
+
+        df = None
+        for layer in layers:
+            landed = pl.read_parquet(layer)
+            if df is not None:
+                # Hours re-landed since the last compaction replace their older copy
+                df = df.join(landed.select(["date", "hour"]).unique(), on=["date", "hour"], how="anti")
+                landed = pl.concat([df, landed], how="diagonal_relaxed")
+            df = landed
+
+        write_parquet(df, target, layout)
+        for path in paths:
+            path.unlink()
+
+        compacted[target.name] = len(df)
+        logger.info(f"Compacted {len(paths)} files → {target} ({len(df)} rows)")
+
+    return compacted
+
+
+if __name__ == "__main__":
+    import sys
+    from src.pipeline.bronze import BRONZE_PATH
+    from src.pipeline.silver import SILVER_PATH
+
+    period = sys.argv[1] if len(sys.argv) > 1 else "day"
+    for layer_path in (BRONZE_PATH, SILVER_PATH):
+        print(compact_layer(layer_path, period))
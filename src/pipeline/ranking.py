@@ -0,0 +1,6 @@
+# Sort keys with a precomputed `<key>_rank` column in gold, shared by both gold
+# engines, the warehouse queries and the API. Ranks are dense 1..N, so a page
+# costs the same at any depth. Gold is stored in total_events_rank order, so only
+# that key is a clustered range read; the others filter every row of the table.
+REPO_SORT_KEYS = ("total_events", "push_count", "star_count", "fork_count", "pr_count", "unique_contributors", "commit_count")
+CONTRIBUTOR_SORT_KEYS = ("total_events", "unique_repos", "push_count", "org_events", "commit_count")
@@ -1,20 +1,27 @@
 import polars as pl
 from pathlib import Path
 from loguru import logger
+from src.pipeline.layout import scan_hour, write_parquet
 
 BRONZE_PATH = Path("data/bronze")
 SILVER_PATH = Path("data/silver")
+PAYLOAD_COLUMNS = {"payload_size": pl.Int64, "payload_action": pl.Utf8, "payload_pull_request_merged": pl.Boolean}
 
 
 def to_silver(year: int, month: int, day: int, hour: int) -> pl.DataFrame:
     logger.info(f"Building silver layer for {year}-{month:02d}-{day:02d} hour {hour}...")
 
-    bronze_path = BRONZE_PATH / f"{year}-{month:02d}-{day:02d}-{hour}.parquet"
-    df = pl.read_parquet(bronze_path)
+    lf = scan_hour(BRONZE_PATH, year, month, day, hour)
+    # Bronze landed before payload extraction (or with these paths disabled) gets
+    # typed nulls, so the derived metrics below always exist
+    columns = lf.collect_schema().names()
+    lf = lf.with_columns([
+        pl.lit(None, dtype).alias(column) for column, dtype in PAYLOAD_COLUMNS.items() if column not in columns
+    ])
 
     # Clean and enrich
     df = (
-        df
+        lf
         # Drop nulls on critical fields
         .filter(
             pl.col("actor_login").is_not_null() &
@@ -43,12 +50,20 @@ def to_silver(year: int, month: int, day: int, hour: int) -> pl.DataFrame:
             .alias("event_category"),
             # Is org event
             pl.col("org").is_not_null().alias("is_org_event"),
+            # Payload-derived metrics
+            pl.when(pl.col("type") == "PushEvent").then(pl.col("payload_size")).alias("push_commits"),
+            ((pl.col("type") == "PullRequestEvent") & (pl.col("payload_action") == "closed"))
+              .fill_null(False).alias("is_pr_closed"),
+            ((pl.col("type") == "PullRequestEvent") & (pl.col("payload_action") == "closed")
+              & pl.col("payload_pull_request_merged")).fill_null(False).alias("is_pr_merged"),
         ])
+        # Streaming engine: processed in POLARS_STREAMING_CHUNK_SIZE batches
+        .collect(streaming=True)
     )
 
     SILVER_PATH.mkdir(parents=True, exist_ok=True)
     output_path = SILVER_PATH / f"{year}-{month:02d}-{day:02d}-{hour}.parquet"
-    df.write_parquet(output_path)
+    write_parquet(df, output_path)
 
     logger.info(f"Silver: {len(df)} rows → {output_path}")
     return df
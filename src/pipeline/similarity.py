@@ -0,0 +1,95 @@
+import numpy as np
+import polars as pl
+import scipy.sparse as sp
+from pathlib import Path
+from loguru import logger
+from src.pipeline.layout import layout_from_env, read_hour, write_parquet
+
+SILVER_PATH = Path("data/silver")
+GOLD_PATH = Path("data/gold")
+
+TOP_K = 10
+# Actors touching more repos than this in the window are treated as bots: an actor
+# with degree d adds d² entries to the co-contribution product
+MAX_ACTOR_DEGREE = 50
+BATCH_SIZE = 4096
+
+SIMILARITY_LAYOUT = layout_from_env(sort_keys=("repo_name", "rank"))
+
+
+def build_incidence(df: pl.DataFrame, max_actor_degree: int = MAX_ACTOR_DEGREE) -> tuple[sp.csr_matrix, pl.Series]:
+    pairs = (
+        df.select(["actor_login", "repo_name"])
+        .unique()
+        .filter(~pl.col("actor_login").str.ends_with("[bot]"))
+        .filter(pl.len().over("actor_login") <= max_actor_degree)
+        .with_columns([
+            (pl.col("actor_login").rank("dense") - 1).cast(pl.Int32).alias("actor_idx"),
+            (pl.col("repo_name").rank("dense") - 1).cast(pl.Int32).alias("repo_idx"),
+        ])
+    )
+    repos = pairs.select(["repo_idx", "repo_name"]).unique().sort("repo_idx")["repo_name"]
+    n_actors = pairs["actor_idx"].max() + 1 if len(pairs) else 0
+
+    incidence = sp.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int32), (pairs["actor_idx"].to_numpy(), pairs["repo_idx"].to_numpy())),
+        shape=(n_actors, len(repos)),
+    )
+    return incidence, repos
+
+
+def co_contribution_neighbors(incidence: sp.csr_matrix, top_k: int = TOP_K, batch_size: int = BATCH_SIZE) -> pl.DataFrame:
+    repos_by_actor = incidence.T.tocsr()
+    degree = np.asarray(incidence.sum(axis=0)).ravel()
+
+    batches = []
+    for start in range(0, incidence.shape[1], batch_size):
+        # (batch × actors) @ (actors × repos) → shared contributor counts for this slice.
+        # Each batch holds complete rows, so top-k is taken before the next one is built.
+        shared = (repos_by_actor[start:start + batch_size] @ incidence).tocoo()
+        rows = shared.row + start
+        keep = rows != shared.col
+        rows, cols, counts = rows[keep], shared.col[keep], shared.data[keep]
+        batches.append(
+            pl.DataFrame({
+                "repo_idx": rows.astype(np.int32),
+                "related_idx": cols.astype(np.int32),
+                "shared_contributors": counts.astype(np.int32),
+                "jaccard": counts / (degree[rows] + degree[cols] - counts),
+            })
+            .sort(["repo_idx", "shared_contributors", "jaccard", "related_idx"], descending=[False, True, True, False])
+            .group_by("repo_idx", maintain_order=True)
+            .head(top_k)
+        )
+
+    neighbors = pl.concat(batches) if batches else pl.DataFrame(schema={
+        "repo_idx": pl.Int32, "related_idx": pl.Int32, "shared_contributors": pl.Int32, "jaccard": pl.Float64,
+    })
+    return neighbors.with_columns(pl.int_range(1, pl.len() + 1, dtype=pl.UInt32).over("repo_idx").alias("rank"))
+
+
+def to_repo_similarity(year: int, month: int, day: int, hour: int, top_k: int = TOP_K) -> pl.DataFrame:
+    logger.info(f"Building repo_similarity for {year}-{month:02d}-{day:02d} hour {hour}...")
+
+    df = read_hour(SILVER_PATH, year, month, day, hour)
+    incidence, repos = build_incidence(df)
+    logger.info(f"Incidence matrix: {incidence.shape[0]} actors × {incidence.shape[1]} repos, {incidence.nnz} edges")
+
+    neighbors = co_contribution_neighbors(incidence, top_k, BATCH_SIZE)
+    repo_names = pl.DataFrame({"idx": pl.Series(range(len(repos)), dtype=pl.Int32), "name": repos})
+    repo_similarity = (
+        neighbors
+        .join(repo_names.rename({"idx": "repo_idx", "name": "repo_name"}), on="repo_idx")
+        .join(repo_names.rename({"idx": "related_idx", "name": "related_repo"}), on="related_idx")
+        .select(["repo_name", "related_repo", "shared_contributors", "jaccard", "rank"])
+    )
+
+    GOLD_PATH.mkdir(parents=True, exist_ok=True)
+    write_parquet(repo_similarity, GOLD_PATH / "repo_similarity.parquet", SIMILARITY_LAYOUT)
+    logger.info(f"Gold repo_similarity: {len(repo_similarity)} rows")
+    return repo_similarity
+
+
+if __name__ == "__main__":
+    similarity = to_repo_similarity(2024, 1, 1, 0)
+    print(similarity.sort("shared_contributors", descending=True).head(10))
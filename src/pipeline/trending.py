@@ -0,0 +1,182 @@
+import polars as pl
+from datetime import datetime, timedelta
+from pathlib import Path
+from loguru import logger
+from src.pipeline.layout import GOLD_LAYOUT, read_hour, write_parquet
+
+SILVER_PATH = Path("data/silver")
+GOLD_PATH = Path("data/gold")
+TRENDING_PATH = Path("data/trending")
+
+RECENT_HOURS = 24
+BASELINE_HOURS = 7 * 24
+WINDOW_HOURS = RECENT_HOURS + BASELINE_HOURS
+
+ENTITIES = {"repo": "repo_name", "actor": "actor_login"}
+GOLD_TABLES = {"repo": "trending_repos", "actor": "trending_contributors"}
+METRICS = {"stars": "WatchEvent", "forks": "ForkEvent", "prs": "PullRequestEvent"}
+COUNTS = ["events", *METRICS]
+
+
+def hour_stamp(ts: datetime) -> str:
+    return f"{ts:%Y-%m-%d}-{ts.hour}"
+
+
+def stamp_time(stamp: str) -> datetime:
+    date_str, hour = stamp.rsplit("-", 1)
+    return datetime.fromisoformat(date_str) + timedelta(hours=int(hour))
+
+
+def bucket_path(entity: str, ts: datetime) -> Path:
+    return TRENDING_PATH / "buckets" / entity / f"{hour_stamp(ts)}.parquet"
+
+
+def build_buckets(df: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    counts = [pl.len().cast(pl.Int64).alias("events")] + [
+        (pl.col("type") == event_type).sum().cast(pl.Int64).alias(metric)
+        for metric, event_type in METRICS.items()
+    ]
+    return {entity: df.group_by(key).agg(counts) for entity, key in ENTITIES.items()}
+
+
+def load_bucket(entity: str, ts: datetime) -> pl.DataFrame | None:
+    path = bucket_path(entity, ts)
+    return pl.read_parquet(path) if path.exists() else None
+
+
+def empty_window(key: str) -> pl.DataFrame:
+    schema = {key: pl.Utf8}
+    for window in ("24h", "7d"):
+        schema.update({f"{c}_{window}": pl.Int64 for c in COUNTS})
+    return pl.DataFrame(schema=schema)
+
+
+def window_delta(bucket: pl.DataFrame, key: str, window: str, sign: int) -> pl.DataFrame:
+    return bucket.select([pl.col(key)] + [(pl.col(c) * sign).alias(f"{c}_{window}") for c in COUNTS])
+
+
+def apply_deltas(state: pl.DataFrame, key: str, deltas: list[pl.DataFrame]) -> pl.DataFrame:
+    if not deltas:
+        return state
+    value_cols = [c for c in state.columns if c != key]
+    return (
+        pl.concat([state, *deltas], how="diagonal")
+        .fill_null(0)
+        .group_by(key)
+        .agg(pl.col(value_cols).sum())
+        .filter(pl.any_horizontal(pl.col(value_cols) != 0))
+        .select(state.columns)
+    )
+
+
+def advance_window(state: pl.DataFrame, entity: str, ts: datetime) -> pl.DataFrame:
+    # Sliding both windows forward by one hour touches three buckets only: the hour
+    # that landed joins the 24h window, the hour leaving it moves into the 7d
+    # baseline, and the hour leaving the baseline expires
+    key = ENTITIES[entity]
+    deltas = []
+    if (landed := load_bucket(entity, ts)) is not None:
+        deltas.append(window_delta(landed, key, "24h", 1))
+    if (moved := load_bucket(entity, ts - timedelta(hours=RECENT_HOURS))) is not None:
+        deltas += [window_delta(moved, key, "24h", -1), window_delta(moved, key, "7d", 1)]
+    if (expired := load_bucket(entity, ts - timedelta(hours=WINDOW_HOURS))) is not None:
+        deltas.append(window_delta(expired, key, "7d", -1))
+    return apply_deltas(state, key, deltas)
+
+
+def rebuild_window(entity: str, end: datetime) -> pl.DataFrame:
+    key = ENTITIES[entity]
+    deltas = []
+    for offset in range(WINDOW_HOURS):
+        bucket = load_bucket(entity, end - timedelta(hours=offset))
+        if bucket is not None:
+            deltas.append(window_delta(bucket, key, "24h" if offset < RECENT_HOURS else "7d", 1))
+    return apply_deltas(empty_window(key), key, deltas)
+
+
+def score_window(state: pl.DataFrame) -> pl.DataFrame:
+    recent = pl.sum_horizontal([pl.col(f"{m}_24h") for m in METRICS])
+    baseline_daily = pl.sum_horizontal([pl.col(f"{m}_7d") for m in METRICS]) / (BASELINE_HOURS / 24)
+    return (
+        state
+        .with_columns([
+            recent.alias("momentum_24h"),
+            baseline_daily.alias("baseline_daily"),
+            # Poisson-style z-score: activity above the repo's own baseline, damped
+            # so giant repos with steady volume do not dominate
+            ((recent - baseline_daily) / (baseline_daily + 1).sqrt()).alias("trend_score"),
+        ])
+        .sort("trend_score", descending=True)
+    )
+
+
+def window_dir(entity: str) -> Path:
+    return TRENDING_PATH / "windows" / entity
+
+
+def read_window(entity: str) -> tuple[pl.DataFrame | None, datetime | None]:
+    # Each entity's state file is named after the last hour it covers, so the
+    # state and its watermark are replaced together by one atomic rename
+    paths = sorted(window_dir(entity).glob("*.parquet"), key=lambda p: stamp_time(p.stem))
+    if not paths:
+        return None, None
+    return pl.read_parquet(paths[-1]), stamp_time(paths[-1].stem)
+
+
+def write_window(entity: str, state: pl.DataFrame, end: datetime) -> None:
+    path = window_dir(entity) / f"{hour_stamp(end)}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_parquet(state, path, GOLD_LAYOUT)
+    for stale in window_dir(entity).glob("*.parquet"):
+        if stale != path:
+            stale.unlink()
+
+
+def update_trending(year: int, month: int, day: int, hour: int) -> dict[str, pl.DataFrame]:
+    ts = datetime(year, month, day, hour)
+    logger.info(f"Updating trending windows with {year}-{month:02d}-{day:02d} hour {hour}...")
+
+    df = read_hour(SILVER_PATH, year, month, day, hour)
+    for entity, bucket in build_buckets(df).items():
+        bucket_path(entity, ts).parent.mkdir(parents=True, exist_ok=True)
+        write_parquet(bucket, bucket_path(entity, ts), GOLD_LAYOUT)
+
+    GOLD_PATH.mkdir(parents=True, exist_ok=True)
+    trending = {}
+    for entity in ENTITIES:
+        # Watermarks are per entity: a run that fails part-way leaves every
+        # entity either fully advanced or untouched, never replayed twice
+        state, watermark = read_window(entity)
+        end = ts if watermark is None else max(ts, watermark)
+        if watermark is not None and watermark < ts <= watermark + timedelta(hours=WINDOW_HOURS):
+            step = watermark + timedelta(hours=1)
+            while step <= ts:
+                state = advance_window(state, entity, step)
+                step += timedelta(hours=1)
+        else:
+            # First run, an hour re-landed out of order, or a gap wider than the
+            # window: recompute from the retained hourly buckets
+            logger.info(f"Rebuilding {entity} trending window ending {hour_stamp(end)}")
+            state = rebuild_window(entity, end)
+        write_window(entity, state, end)
+
+        table = GOLD_TABLES[entity]
+        trending[table] = score_window(state)
+        write_parquet(trending[table], GOLD_PATH / f"{table}.parquet", GOLD_LAYOUT)
+        logger.info(f"Gold {table}: {len(trending[table])} rows")
+        prune_buckets(entity, end)
+
+    return trending
+
+
+def prune_buckets(entity: str, end: datetime) -> None:
+    # The next advance expires end - WINDOW_HOURS + 1, so nothing older is needed
+    oldest = end - timedelta(hours=WINDOW_HOURS - 1)
+    for path in (TRENDING_PATH / "buckets" / entity).glob("*.parquet"):
+        if stamp_time(path.stem) < oldest:
+            path.unlink()
+
+
+if __name__ == "__main__":
+    trending = update_trending(2024, 1, 1, 0)
+    print(trending["trending_repos"].head(10))
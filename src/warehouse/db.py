@@ -1,6 +1,9 @@
 import duckdb
 from pathlib import Path
 from loguru import logger
+from src.config.resources import duckdb_config
+from src.pipeline.ranking import CONTRIBUTOR_SORT_KEYS, REPO_SORT_KEYS
+from src.warehouse.profiling import phase, record_query
 
 GOLD_PATH = Path("data/gold")
 DB_PATH = Path("data/warehouse.db")
@@ -8,10 +11,10 @@ DB_PATH = Path("data/warehouse.db")
 
 def get_connection() -> duckdb.DuckDBPyConnection:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    return duckdb.connect(str(DB_PATH))
+    return duckdb.connect(str(DB_PATH), config=duckdb_config())
 
 
-def build_warehouse():
+def build_warehouse(skip: tuple[str, ...] = ()):
     logger.info("Building DuckDB warehouse from gold layer...")
     conn = get_connection()
 
@@ -21,9 +24,14 @@ def build_warehouse():
         "hourly_activity": GOLD_PATH / "hourly_activity.parquet",
         "top_contributors": GOLD_PATH / "top_contributors.parquet",
         "org_summary": GOLD_PATH / "org_summary.parquet",
+        "repo_similarity": GOLD_PATH / "repo_similarity.parquet",
+        "trending_repos": GOLD_PATH / "trending_repos.parquet",
+        "trending_contributors": GOLD_PATH / "trending_contributors.parquet",
     }
 
     for table_name, parquet_path in tables.items():
+        if table_name in skip:
+            continue
         if not parquet_path.exists():
             logger.warning(f"Skipping {table_name} — file not found")
             continue
@@ -38,21 +46,44 @@ def build_warehouse():
     logger.info(f"Warehouse built at {DB_PATH}")
 
 
-def query(sql: str) -> list[dict]:
-    conn = get_connection()
-    result = conn.execute(sql).fetchdf()
-    conn.close()
-    return result.to_dict(orient="records")
+def query(sql: str, params: list | None = None) -> list[dict]:
+    with phase("connect"):
+        conn = get_connection()
+    try:
+        result = fetch(conn, sql, params)
+    finally:
+        conn.close()
+    with phase("convert"):
+        # fetchdf() turns SQL NULL into NaN, which JSON responses cannot carry
+        return result.astype(object).where(result.notna(), None).to_dict(orient="records")
+
+
+def fetch(conn: duckdb.DuckDBPyConnection, sql: str, params: list | None = None):
+    with phase("execute"):
+        relation = conn.execute(sql, params)
+    with phase("fetch"):
+        result = relation.fetchdf()
+    record_query(conn, sql, params)
+    return result
 
 
-def get_top_repos(limit: int = 10) -> list[dict]:
+def fetch_scalar(conn: duckdb.DuckDBPyConnection, sql: str, params: list | None = None):
+    with phase("execute"):
+        value = conn.execute(sql, params).fetchone()[0]
+    record_query(conn, sql, params)
+    return value
+
+
+def get_top_repos(limit: int = 10, sort_by: str = "total_events", after_rank: int = 0) -> list[dict]:
+    if sort_by not in REPO_SORT_KEYS:
+        raise ValueError(f"Unknown repo sort key: {sort_by!r}")
     return query(f"""
-        SELECT repo_name, total_events, push_count, star_count,
-               fork_count, pr_count, unique_contributors
+        SELECT {sort_by}_rank AS rank, repo_name, total_events, push_count, star_count,
+               fork_count, pr_count, unique_contributors, commit_count, pr_merged_rate
         FROM top_repos
-        ORDER BY total_events DESC
-        LIMIT {limit}
-    """)
+        WHERE {sort_by}_rank BETWEEN ? AND ?
+        ORDER BY {sort_by}_rank
+    """, [after_rank + 1, after_rank + limit])
 
 
 def get_event_distribution() -> list[dict]:
@@ -71,22 +102,57 @@ def get_hourly_activity() -> list[dict]:
     """)
 
 
-def get_top_contributors(limit: int = 10) -> list[dict]:
+def get_top_contributors(limit: int = 10, sort_by: str = "total_events", after_rank: int = 0) -> list[dict]:
+    if sort_by not in CONTRIBUTOR_SORT_KEYS:
+        raise ValueError(f"Unknown contributor sort key: {sort_by!r}")
     return query(f"""
-        SELECT actor_login, total_events, unique_repos, push_count, org_events
+        SELECT {sort_by}_rank AS rank, actor_login, total_events, unique_repos, push_count, org_events, commit_count
         FROM top_contributors
-        ORDER BY total_events DESC
-        LIMIT {limit}
-    """)
+        WHERE {sort_by}_rank BETWEEN ? AND ?
+        ORDER BY {sort_by}_rank
+    """, [after_rank + 1, after_rank + limit])
+
+
+def get_related_repos(repo_name: str, limit: int = 10) -> list[dict]:
+    return query("""
+        SELECT related_repo, shared_contributors, jaccard, rank
+        FROM repo_similarity
+        WHERE repo_name = ?
+        ORDER BY rank
+        LIMIT ?
+    """, [repo_name, limit])
+
+
+def get_trending_repos(limit: int = 10) -> list[dict]:
+    return query("""
+        SELECT repo_name, trend_score, momentum_24h, baseline_daily,
+               stars_24h, forks_24h, prs_24h, stars_7d, forks_7d, prs_7d
+        FROM trending_repos
+        ORDER BY trend_score DESC
+        LIMIT ?
+    """, [limit])
+
+
+def get_trending_contributors(limit: int = 10) -> list[dict]:
+    return query("""
+        SELECT actor_login, trend_score, momentum_24h, baseline_daily,
+               events_24h, prs_24h, events_7d, prs_7d
+        FROM trending_contributors
+        ORDER BY trend_score DESC
+        LIMIT ?
+    """, [limit])
 
 
 def get_summary_stats() -> dict:
-    conn = get_connection()
-    total_events = conn.execute("SELECT SUM(count) FROM event_distribution").fetchone()[0]
-    total_repos = conn.execute("SELECT COUNT(*) FROM top_repos").fetchone()[0]
-    total_contributors = conn.execute("SELECT COUNT(*) FROM top_contributors").fetchone()[0]
-    top_event = conn.execute("SELECT type FROM event_distribution ORDER BY count DESC LIMIT 1").fetchone()[0]
-    conn.close()
+    with phase("connect"):
+        conn = get_connection()
+    try:
+        total_events = fetch_scalar(conn, "SELECT SUM(count) FROM event_distribution")
+        total_repos = fetch_scalar(conn, "SELECT COUNT(*) FROM top_repos")
+        total_contributors = fetch_scalar(conn, "SELECT COUNT(*) FROM top_contributors")
+        top_event = fetch_scalar(conn, "SELECT type FROM event_distribution ORDER BY count DESC LIMIT 1")
+    finally:
+        conn.close()
     return {
         "total_events": int(total_events),
         "total_repos_tracked": int(total_repos),
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from statistics import quantiles
+
+PHASES = ("connect", "execute", "fetch", "convert")
+SLOW_QUERY_MS = float(os.getenv("DATAFLOW_SLOW_QUERY_MS", "500"))
+# Per-request EXPLAIN ANALYZE re-runs every query and returns its SQL, so it is
+# off unless the server opts in
+ALLOW_PROFILE = os.getenv("DATAFLOW_ALLOW_PROFILE", "0").lower() in ("1", "true")
+UNMATCHED_ENDPOINT = "<unmatched>"
+SAMPLES_PER_ENDPOINT = 1024
+
+
+@dataclass
+class RequestProfile:
+    explain: bool = False
+    phases: dict[str, float] = field(default_factory=dict)
+    queries: list[dict] = field(default_factory=list)
+
+
+# Set per request by the API middleware; warehouse calls outside a request
+# (pipeline, dashboard) see None and skip all bookkeeping
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+
+
+@contextmanager
+def profile_request(explain: bool = False):
+    profile = RequestProfile(explain=explain)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.phases[name] = profile.phases.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def record_query(conn, sql: str, params: list | None = None) -> None:
+    profile = _current.get()
+    if profile is None:
+        return
+    entry = {"sql": " ".join(sql.split())}
+    if profile.explain:
+        # Re-runs the query under the profiler; only on explicit opt-in
+        entry["explain_analyze"] = conn.execute(f"EXPLAIN ANALYZE {sql}", params).fetchall()[0][1]
+    profile.queries.append(entry)
+
+
+@dataclass
+class EndpointStats:
+    count: int = 0
+    slow_count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    phase_ms: dict[str, float] = field(default_factory=dict)
+    samples: deque = field(default_factory=lambda: deque(maxlen=SAMPLES_PER_ENDPOINT))
+
+
+_stats: dict[str, EndpointStats] = {}
+_stats_lock = threading.Lock()
+
+
+def record_timing(endpoint: str, total_ms: float, phases: dict[str, float]) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(endpoint, EndpointStats())
+        stats.count += 1
+        stats.slow_count += total_ms >= SLOW_QUERY_MS
+        stats.total_ms += total_ms
+        stats.max_ms = max(stats.max_ms, total_ms)
+        stats.samples.append(total_ms)
+        for name, ms in phases.items():
+            stats.phase_ms[name] = stats.phase_ms.get(name, 0.0) + ms
+
+
+def timing_summary() -> dict[str, dict]:
+    summary = {}
+    with _stats_lock:
+        for endpoint, stats in _stats.items():
+            samples = sorted(stats.samples)
+            cuts = quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+            summary[endpoint] = {
+                "count": stats.count,
+                "slow_count": stats.slow_count,
+                "mean_ms": round(stats.total_ms / stats.count, 3),
+                "p50_ms": round(cuts[49], 3),
+                "p95_ms": round(cuts[94], 3),
+                "max_ms": round(stats.max_ms, 3),
+                "mean_phase_ms": {name: round(ms / stats.count, 3) for name, ms in stats.phase_ms.items()},
+            }
+    # Hottest endpoints first: where the most cumulative time goes
+    return dict(sorted(summary.items(), key=lambda item: -item[1]["mean_ms"] * item[1]["count"]))
+
+
+def reset_timings() -> None:
+    with _stats_lock:
+        _stats.clear()
+
+
+def server_timing(total_ms: float, phases: dict[str, float]) -> str:
+    entries = [f"{name};dur={phases[name]:.3f}" for name in PHASES if name in phases]
+    entries.append(f"total;dur={total_ms:.3f}")
+    return ", ".join(entries)
@@ -0,0 +1,130 @@
+import duckdb
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from src.api.main import app
+
+client = TestClient(app)
+
+
+# ── Related Repos Tests ───────────────────────────────────────────────────────
+def test_related_repos():
+    related = [{"related_repo": "x/2", "shared_contributors": 2, "jaccard": 0.5, "rank": 1}]
+    with patch("src.api.main.get_related_repos", return_value=related) as get_related:
+        response = client.get("/repos/x/1/related?limit=5")
+    assert response.status_code == 200
+    assert response.json() == {"repo": "x/1", "related": related, "count": 1}
+    get_related.assert_called_once_with("x/1", 5)
+
+
+def test_related_repos_unknown_repo():
+    with patch("src.api.main.get_related_repos", return_value=[]):
+        response = client.get("/repos/nobody/nothing/related")
+    assert response.status_code == 404
+
+
+# ── Trending Tests ────────────────────────────────────────────────────────────
+def test_trending_by_entity():
+    with patch("src.api.main.get_trending_repos", return_value=[{"repo_name": "x/1"}]), \
+         patch("src.api.main.get_trending_contributors", return_value=[{"actor_login": "u1"}]):
+        repos = client.get("/trending").json()
+        actors = client.get("/trending?entity=actor&limit=5").json()
+    assert repos["trending"] == [{"repo_name": "x/1"}]
+    assert actors == {"entity": "actor", "trending": [{"actor_login": "u1"}], "count": 1}
+    assert client.get("/trending?entity=org").status_code == 422
+
+
+# ── Ranking Pagination Tests ──────────────────────────────────────────────────
+def test_repos_keyset_pagination(tmp_path):
+    from src.pipeline.gold import to_gold
+    from src.warehouse.db import build_warehouse
+    from tests.test_pipeline import make_silver_df
+    with patch("src.pipeline.gold.scan_hour", return_value=make_silver_df().lazy()), \
+         patch("src.pipeline.gold.GOLD_PATH", tmp_path / "gold"), \
+         patch("src.warehouse.db.GOLD_PATH", tmp_path / "gold"), \
+         patch("src.warehouse.db.DB_PATH", tmp_path / "warehouse.db"):
+        to_gold(2024, 1, 1, 0)
+        build_warehouse()
+        first = client.get("/repos?page_size=2")
+        last = client.get("/repos?sort_by=commit_count&after_rank=2&page_size=2")
+
+    assert first.status_code == 200
+    body = first.json()
+    assert [r["rank"] for r in body["repos"]] == [1, 2]
+    assert body["next_after_rank"] == 2
+    assert body["count"] == 2
+    # Repos without closed PRs have a NULL merged-PR rate
+    assert body["repos"][0] == {**body["repos"][0], "repo_name": "owner1/repo1", "pr_merged_rate": 1.0}
+    assert body["repos"][1]["pr_merged_rate"] is None
+
+    assert last.status_code == 200
+    assert last.json()["count"] == 1
+    assert last.json()["next_after_rank"] is None
+
+
+def test_contributors_last_page_and_bad_sort_key():
+    with patch("src.api.main.get_top_contributors", return_value=[{"rank": 3, "actor_login": "u3"}]):
+        body = client.get("/contributors?after_rank=2&page_size=5").json()
+    assert body["next_after_rank"] is None
+    assert client.get("/contributors?sort_by=star_count").status_code == 422
+
+
+# ── Profiling Tests ───────────────────────────────────────────────────────────
+def make_warehouse(db_path):
+    conn = duckdb.connect(str(db_path))
+    conn.execute("CREATE TABLE event_distribution AS SELECT 'PushEvent' AS type, 'code' AS event_category, 3 AS count")
+    conn.execute("CREATE TABLE top_repos AS SELECT 'x/1' AS repo_name")
+    conn.execute("CREATE TABLE top_contributors AS SELECT 'u1' AS actor_login")
+    conn.close()
+
+
+def test_server_timing_and_endpoint_aggregates(tmp_path):
+    from src.warehouse.profiling import reset_timings
+    make_warehouse(tmp_path / "warehouse.db")
+    reset_timings()
+    with patch("src.warehouse.db.DB_PATH", tmp_path / "warehouse.db"):
+        response = client.get("/summary")
+        client.get("/summary")
+    assert response.json()["total_events"] == 3
+    assert "_profile" not in response.json()
+    timing = response.headers["server-timing"]
+    for name in ("connect", "execute", "total"):
+        assert f"{name};dur=" in timing
+
+    stats = client.get("/debug/timings").json()["endpoints"]["GET /summary"]
+    assert stats["count"] == 2
+    assert set(stats["mean_phase_ms"]) == {"connect", "execute"}
+
+
+def test_explain_analyze_on_demand(tmp_path):
+    make_warehouse(tmp_path / "warehouse.db")
+    with patch("src.warehouse.db.DB_PATH", tmp_path / "warehouse.db"):
+        assert "_profile" not in client.get("/events?profile=1").json()
+        with patch("src.api.main.ALLOW_PROFILE", True):
+            body = client.get("/events", headers={"X-Debug-Profile": "1"}).json()
+    assert body["events"][0]["type"] == "PushEvent"
+    [profiled] = body["_profile"]["queries"]
+    assert profiled["sql"].startswith("SELECT type, event_category, count")
+    assert "Query Profiling Information" in profiled["explain_analyze"]
+    assert set(body["_profile"]["phases_ms"]) == {"connect", "execute", "fetch", "convert"}
+
+
+def test_unmatched_routes_share_one_timing_key():
+    from src.warehouse.profiling import UNMATCHED_ENDPOINT, reset_timings
+    reset_timings()
+    for i in range(3):
+        assert client.get(f"/no/such/path/{i}").status_code == 404
+    endpoints = client.get("/debug/timings").json()["endpoints"]
+    assert endpoints[UNMATCHED_ENDPOINT]["count"] == 3
+    assert not any(key.startswith("GET /no/") for key in endpoints)
+
+
+def test_failed_requests_are_timed():
+    from fastapi.testclient import TestClient
+    from src.warehouse.profiling import reset_timings
+    reset_timings()
+    failing_client = TestClient(app, raise_server_exceptions=False)
+    # NaN cannot be rendered as JSON, so the failure happens after the handler returns
+    with patch("src.api.main.get_top_repos", return_value=[{"rank": 1, "pr_merged_rate": float("nan")}]):
+        assert failing_client.get("/repos").status_code == 500
+    assert client.get("/debug/timings").json()["endpoints"]["GET /repos"]["count"] == 1
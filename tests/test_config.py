@@ -0,0 +1,38 @@
+import duckdb
+import pytest
+from unittest.mock import patch
+
+
+# ── Resource Profile Tests ────────────────────────────────────────────────────
+def test_profile_file_then_env_overrides(tmp_path, monkeypatch):
+    from src.config.resources import load_profile
+    config = tmp_path / "dataflow.toml"
+    config.write_text('[resources.api]\nduckdb_memory_limit = "256MB"\nduckdb_threads = 3\n')
+    monkeypatch.setenv("DATAFLOW_API_DUCKDB_THREADS", "1")
+    with patch("src.config.resources.CONFIG_PATH", config):
+        profile = load_profile("api")
+    assert profile.duckdb_memory_limit == "256MB"
+    assert profile.duckdb_threads == 1
+
+
+def test_profile_rejects_unknown_role_and_keys(tmp_path):
+    from src.config.resources import load_profile
+    config = tmp_path / "dataflow.toml"
+    config.write_text('[resources.pipeline]\nmemory = "1GB"\n')
+    with pytest.raises(ValueError):
+        load_profile("batch")
+    with patch("src.config.resources.CONFIG_PATH", config), pytest.raises(ValueError):
+        load_profile("pipeline")
+
+
+def test_duckdb_connection_applies_profile(tmp_path):
+    from src.config.resources import ResourceProfile, duckdb_config
+    profile = ResourceProfile(duckdb_memory_limit="300MB", duckdb_threads=1,
+                              duckdb_temp_directory=str(tmp_path / "spill"))
+    conn = duckdb.connect(config=duckdb_config(profile))
+    threads, temp_directory = conn.execute(
+        "SELECT current_setting('threads'), current_setting('temp_directory')"
+    ).fetchone()
+    conn.close()
+    assert threads == 1
+    assert temp_directory == str(tmp_path / "spill")
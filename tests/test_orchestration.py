@@ -0,0 +1,83 @@
+import pytest
+import subprocess
+import sys
+from unittest.mock import MagicMock, patch
+
+
+# ── Runner Tests ──────────────────────────────────────────────────────────────
+def test_runner_retries_until_success():
+    from src.orchestration.runner import Task, run_task
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("transient")
+        return "ok"
+
+    assert run_task(Task("flaky", flaky, retries=2)) == "ok"
+    assert len(calls) == 3
+
+
+def test_runner_raises_after_retries():
+    from src.orchestration.runner import Task, run_task
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        run_task(Task("broken", broken, retries=1))
+    assert len(calls) == 2
+
+
+def test_runner_parallel_collects_failures():
+    from src.orchestration.runner import Task, run_parallel
+
+    def fail():
+        raise ValueError("bad hour")
+
+    results, failures = run_parallel({
+        "a": [Task("one", lambda: 1), Task("two", lambda: 2)],
+        "b": [Task("fail", fail)],
+    }, max_workers=2)
+    assert results == {"a": [1, 2]}
+    assert list(failures) == ["b"]
+
+
+# ── CLI Tests ─────────────────────────────────────────────────────────────────
+def test_cli_does_not_import_heavy_modules():
+    code = "import sys, src.orchestration.cli; print(sorted({'prefect', 'duckdb', 'polars'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_cli_backfill_runs_each_hour_then_gold_once():
+    from src.orchestration.cli import main
+    with patch("src.pipeline.bronze.to_bronze", return_value=[1, 2]) as bronze, \
+         patch("src.pipeline.silver.to_silver", return_value=[1]) as silver, \
+         patch("src.pipeline.gold.to_gold", return_value={"top_repos": [1]}) as gold, \
+         patch("src.pipeline.similarity.to_repo_similarity", return_value=[1]) as similarity, \
+         patch("src.pipeline.trending.update_trending", return_value={"trending_repos": [1]}) as trending:
+        code = main(["backfill", "--start", "2024-01-01T22", "--end", "2024-01-02T01", "--skip-warehouse"])
+    assert code == 0
+    assert bronze.call_count == 4
+    assert silver.call_count == 4
+    gold.assert_called_once_with(2024, 1, 2, 1)
+    similarity.assert_called_once_with(2024, 1, 2, 1)
+    assert [c.args for c in trending.call_args_list] == [
+        (2024, 1, 1, 22), (2024, 1, 1, 23), (2024, 1, 2, 0), (2024, 1, 2, 1)
+    ]
+
+
+def test_cli_backfill_prefect_passes_engine_options():
+    from src.orchestration.cli import main
+    etl_flow = MagicMock(return_value={"gold": {}})
+    with patch("src.orchestration.cli.load_prefect_flow", return_value=etl_flow), \
+         patch("src.warehouse.db.build_warehouse") as build_warehouse:
+        code = main(["backfill", "--start", "2024-01-01T00", "--end", "2024-01-01T01", "--backend", "prefect",
+                     "--engine", "duckdb", "--export-parquet"])
+    assert code == 0
+    assert [c.kwargs for c in etl_flow.call_args_list] == [{"engine": "duckdb", "export_parquet": True}] * 2
+    assert "top_repos" in build_warehouse.call_args.args[0]
@@ -1,5 +1,6 @@
 import pytest
 import polars as pl
+from datetime import datetime
 from pathlib import Path
 from unittest.mock import patch
 
@@ -39,6 +40,60 @@ def test_bronze_types():
         df = to_bronze(2024, 1, 1, 0)
         assert df["public"].dtype == pl.Boolean
         assert df["hour"].dtype == pl.Int32
+        assert df["payload_size"].dtype == pl.Int64
+        assert df["payload_pull_request_merged"].dtype == pl.Boolean
+
+
+def test_parse_events_payload_fields(tmp_path):
+    import gzip
+    import json
+    from src.ingestion.gharchive import parse_events, payload_fields
+    lines = [
+        {"id": "1", "type": "PushEvent", "actor": {"login": "user1"}, "repo": {"name": "user1/repo"},
+         "payload": {"size": 3, "commits": [{"sha": "a"}, {"sha": "b"}, {"sha": "c"}]},
+         "public": True, "created_at": "2024-01-01T00:00:00Z"},
+        {"id": "2", "type": "PullRequestEvent", "actor": {"login": "user2"}, "repo": {"name": "user1/repo"},
+         "payload": {"action": "closed", "pull_request": {"merged": True, "title": "fix"}},
+         "public": True, "created_at": "2024-01-01T00:00:01Z", "org": {"login": "myorg"}},
+        # Type mismatch on a requested path: kept, value nulled
+        {"id": "3", "type": "OtherEvent", "actor": {"login": "user3"}, "repo": {"name": "user3/repo"},
+         "payload": {"size": "large"}, "public": True, "created_at": "2024-01-01T00:00:02Z"},
+        # Scalar where an object is expected on the way to a requested path
+        {"id": "4", "type": "PullRequestEvent", "actor": {"login": "user4"}, "repo": {"name": "user4/repo"},
+         "payload": {"size": 2, "pull_request": "x"}, "public": True, "created_at": "2024-01-01T00:00:03Z"},
+    ]
+    path = tmp_path / "events.json.gz"
+    with gzip.open(path, "wt") as f:
+        f.writelines(json.dumps(line) + "\n" for line in lines)
+        f.write("{not json\n[1, 2]\n")
+
+    events = parse_events(path, payload_fields("payload.size:int,payload.action:str,payload.pull_request.merged:bool"))
+    assert len(events) == 4
+    assert events[0]["payload_size"] == 3
+    assert events[1]["payload_action"] == "closed"
+    assert events[1]["payload_pull_request_merged"] is True
+    assert events[1]["org"] == "myorg"
+    assert events[2]["payload_size"] is None
+    assert events[2]["actor_login"] == "user3"
+    assert events[3]["payload_pull_request_merged"] is None
+    assert events[3]["repo_name"] == "user4/repo"
+
+    # An int for a float path lands as a float whether or not the line needed the fallback
+    events = parse_events(path, payload_fields("payload.size:float,payload.pull_request.merged:bool"))
+    assert events[0]["payload_size"] == 3.0 and isinstance(events[0]["payload_size"], float)
+    assert events[3]["payload_size"] == 2.0 and isinstance(events[3]["payload_size"], float)
+
+    events = parse_events(path, payload_fields(""))
+    assert "payload_size" not in events[0]
+    assert events[0]["repo_name"] == "user1/repo"
+
+
+def test_payload_fields_validation():
+    from src.ingestion.gharchive import payload_fields
+    with pytest.raises(ValueError):
+        payload_fields("payload.size:decimal")
+    with pytest.raises(ValueError):
+        payload_fields("actor.login:str")
 
 
 # ── Silver Tests ──────────────────────────────────────────────────────────────
@@ -62,7 +117,7 @@ def make_bronze_df():
 def test_silver_event_categories():
     from src.pipeline.silver import to_silver
     bronze_df = make_bronze_df()
-    with patch("src.pipeline.silver.pl.read_parquet", return_value=bronze_df), \
+    with patch("src.pipeline.silver.scan_hour", return_value=bronze_df.lazy()), \
          patch("src.pipeline.silver.SILVER_PATH", Path("tests/tmp")):
         df = to_silver(2024, 1, 1, 0)
         categories = df["event_category"].to_list()
@@ -75,7 +130,7 @@ def test_silver_event_categories():
 def test_silver_repo_parsing():
     from src.pipeline.silver import to_silver
     bronze_df = make_bronze_df()
-    with patch("src.pipeline.silver.pl.read_parquet", return_value=bronze_df), \
+    with patch("src.pipeline.silver.scan_hour", return_value=bronze_df.lazy()), \
          patch("src.pipeline.silver.SILVER_PATH", Path("tests/tmp")):
         df = to_silver(2024, 1, 1, 0)
         assert "repo_owner" in df.columns
@@ -88,7 +143,7 @@ def test_silver_repo_parsing():
 def test_silver_null_filtering():
     from src.pipeline.silver import to_silver
     bronze_df = make_bronze_df()
-    with patch("src.pipeline.silver.pl.read_parquet", return_value=bronze_df), \
+    with patch("src.pipeline.silver.scan_hour", return_value=bronze_df.lazy()), \
          patch("src.pipeline.silver.SILVER_PATH", Path("tests/tmp")):
         df = to_silver(2024, 1, 1, 0)
         assert df["actor_login"].null_count() == 0
@@ -97,7 +152,7 @@ def test_silver_null_filtering():
 def test_silver_org_flag():
     from src.pipeline.silver import to_silver
     bronze_df = make_bronze_df()
-    with patch("src.pipeline.silver.pl.read_parquet", return_value=bronze_df), \
+    with patch("src.pipeline.silver.scan_hour", return_value=bronze_df.lazy()), \
          patch("src.pipeline.silver.SILVER_PATH", Path("tests/tmp")):
         df = to_silver(2024, 1, 1, 0)
         assert "is_org_event" in df.columns
@@ -105,6 +160,28 @@ def test_silver_org_flag():
         assert org_row["is_org_event"][0] == True
 
 
+def test_silver_payload_metrics():
+    from src.pipeline.silver import to_silver
+    bronze_df = make_bronze_df().with_columns([
+        pl.Series("payload_size", [4, None, None, None], dtype=pl.Int64),
+        pl.Series("payload_action", [None, "started", "closed", "closed"]),
+        pl.Series("payload_pull_request_merged", [None, None, True, None], dtype=pl.Boolean),
+    ])
+    with patch("src.pipeline.silver.scan_hour", return_value=bronze_df.lazy()), \
+         patch("src.pipeline.silver.SILVER_PATH", Path("tests/tmp")):
+        df = to_silver(2024, 1, 1, 0).sort("id")
+        assert df["push_commits"].to_list() == [4, None, None, None]
+        assert df["is_pr_closed"].to_list() == [False, False, True, False]
+        assert df["is_pr_merged"].to_list() == [False, False, True, False]
+
+    # Bronze without payload columns still yields the derived columns
+    with patch("src.pipeline.silver.scan_hour", return_value=make_bronze_df().lazy()), \
+         patch("src.pipeline.silver.SILVER_PATH", Path("tests/tmp")):
+        df = to_silver(2024, 1, 1, 0)
+        assert df["push_commits"].null_count() == len(df)
+        assert not df["is_pr_merged"].any()
+
+
 # ── Gold Tests ────────────────────────────────────────────────────────────────
 def make_silver_df():
     return pl.DataFrame({
@@ -126,13 +203,16 @@ def make_silver_df():
         "day_of_week": [1, 1, 1, 1, 1],
         "event_category": ["code", "code", "social", "review", "issues"],
         "is_org_event": [False, False, True, False, False],
+        "push_commits": pl.Series([2, 5, None, None, None], dtype=pl.Int64),
+        "is_pr_closed": [False, False, False, True, False],
+        "is_pr_merged": [False, False, False, True, False],
     })
 
 
 def test_gold_top_repos():
     from src.pipeline.gold import to_gold
     silver_df = make_silver_df()
-    with patch("src.pipeline.gold.pl.read_parquet", return_value=silver_df), \
+    with patch("src.pipeline.gold.scan_hour", return_value=silver_df.lazy()), \
          patch("src.pipeline.gold.GOLD_PATH", Path("tests/tmp")):
         gold = to_gold(2024, 1, 1, 0)
         assert "top_repos" in gold
@@ -144,7 +224,7 @@ def test_gold_top_repos():
 def test_gold_event_distribution():
     from src.pipeline.gold import to_gold
     silver_df = make_silver_df()
-    with patch("src.pipeline.gold.pl.read_parquet", return_value=silver_df), \
+    with patch("src.pipeline.gold.scan_hour", return_value=silver_df.lazy()), \
          patch("src.pipeline.gold.GOLD_PATH", Path("tests/tmp")):
         gold = to_gold(2024, 1, 1, 0)
         assert "event_distribution" in gold
@@ -156,10 +236,264 @@ def test_gold_event_distribution():
 def test_gold_returns_all_tables():
     from src.pipeline.gold import to_gold
     silver_df = make_silver_df()
-    with patch("src.pipeline.gold.pl.read_parquet", return_value=silver_df), \
+    with patch("src.pipeline.gold.scan_hour", return_value=silver_df.lazy()), \
          patch("src.pipeline.gold.GOLD_PATH", Path("tests/tmp")):
         gold = to_gold(2024, 1, 1, 0)
         assert set(gold.keys()) == {
             "top_repos", "event_distribution", "hourly_activity",
             "top_contributors", "org_summary"
-        }
\ No newline at end of file
+        }
+
+def test_gold_full_rankings():
+    from src.pipeline.gold import to_gold
+    silver_df = make_silver_df()
+    with patch("src.pipeline.gold.scan_hour", return_value=silver_df.lazy()), \
+         patch("src.pipeline.gold.GOLD_PATH", Path("tests/tmp")):
+        gold = to_gold(2024, 1, 1, 0)
+    top = gold["top_repos"]
+    assert len(top) == silver_df["repo_name"].n_unique()
+    assert top["total_events_rank"].to_list() == [1, 2, 3]
+    assert top["repo_name"][0] == "owner1/repo1"
+    assert sorted(top["star_count_rank"].to_list()) == [1, 2, 3]
+    assert top.filter(pl.col("star_count_rank") == 1)["repo_name"][0] == "owner2/repo2"
+
+
+def test_gold_payload_metrics():
+    from src.pipeline.gold import to_gold
+    silver_df = make_silver_df()
+    with patch("src.pipeline.gold.scan_hour", return_value=silver_df.lazy()), \
+         patch("src.pipeline.gold.GOLD_PATH", Path("tests/tmp")):
+        gold = to_gold(2024, 1, 1, 0)
+    repos = {row["repo_name"]: row for row in gold["top_repos"].to_dicts()}
+    assert repos["owner1/repo1"]["commit_count"] == 7
+    assert repos["owner1/repo1"]["pr_merged_rate"] == 1.0
+    assert repos["owner2/repo2"]["commit_count"] == 0
+    assert repos["owner2/repo2"]["pr_merged_rate"] is None
+    contributors = {row["actor_login"]: row for row in gold["top_contributors"].to_dicts()}
+    assert contributors["user2"]["commit_count"] == 5
+    assert contributors["user2"]["commit_count_rank"] == 1
+
+
+def test_gold_engines_identical(tmp_path):
+    import duckdb
+    from src.pipeline.silver import to_silver
+    from src.pipeline.gold import to_gold
+    from src.pipeline.gold_sql import GOLD_TABLES, to_gold_duckdb
+    from src.warehouse.db import build_warehouse
+
+    bronze_df = pl.concat([make_bronze_df()] * 3).with_columns(
+        pl.Series("actor_login", ["user1", "user2", "user3", "user4", "user1", "user1"] * 2),
+        pl.Series("payload_size", [3, None, None, None] * 3, dtype=pl.Int64),
+        pl.Series("payload_action", [None, "started", "closed", "opened"] * 2 + [None, "started", "closed", "closed"]),
+        pl.Series("payload_pull_request_merged", [None, None, True, None] * 2 + [None, None, False, None]),
+    )
+    with patch("src.pipeline.silver.scan_hour", return_value=bronze_df.lazy()), \
+         patch("src.pipeline.silver.SILVER_PATH", tmp_path / "silver"):
+        to_silver(2024, 1, 1, 0)
+
+    with patch("src.pipeline.gold.SILVER_PATH", tmp_path / "silver"), \
+         patch("src.pipeline.gold.GOLD_PATH", tmp_path / "gold"), \
+         patch("src.warehouse.db.GOLD_PATH", tmp_path / "gold"), \
+         patch("src.warehouse.db.DB_PATH", tmp_path / "polars.db"):
+        to_gold(2024, 1, 1, 0)
+        build_warehouse()
+
+    with patch("src.pipeline.gold_sql.SILVER_PATH", tmp_path / "silver"), \
+         patch("src.pipeline.gold_sql.GOLD_PATH", tmp_path / "gold_sql"), \
+         patch("src.warehouse.db.DB_PATH", tmp_path / "duckdb.db"):
+        counts = to_gold_duckdb(2024, 1, 1, 0, export_parquet=True)
+
+    polars_db = duckdb.connect(str(tmp_path / "polars.db"))
+    duckdb_db = duckdb.connect(str(tmp_path / "duckdb.db"))
+    for table in GOLD_TABLES:
+        expected = polars_db.execute(f"SELECT * FROM {table}").pl()
+        actual = duckdb_db.execute(f"SELECT * FROM {table}").pl()
+        assert actual.equals(expected), table
+        assert pl.read_parquet(tmp_path / "gold_sql" / f"{table}.parquet").equals(expected), table
+        assert counts[table] == len(expected)
+
+
+def test_gold_duckdb_export_non_zstd(tmp_path):
+    from dataclasses import replace
+    from src.pipeline.gold_sql import GOLD_LAYOUT, to_gold_duckdb
+    from src.pipeline.silver import to_silver
+    with patch("src.pipeline.silver.scan_hour", return_value=make_bronze_df().lazy()), \
+         patch("src.pipeline.silver.SILVER_PATH", tmp_path / "silver"):
+        to_silver(2024, 1, 1, 0)
+    with patch("src.pipeline.gold_sql.SILVER_PATH", tmp_path / "silver"), \
+         patch("src.pipeline.gold_sql.GOLD_PATH", tmp_path / "gold"), \
+         patch("src.pipeline.gold_sql.GOLD_LAYOUT", replace(GOLD_LAYOUT, compression="snappy")), \
+         patch("src.warehouse.db.DB_PATH", tmp_path / "warehouse.db"):
+        counts = to_gold_duckdb(2024, 1, 1, 0, export_parquet=True)
+    assert len(pl.read_parquet(tmp_path / "gold" / "top_repos.parquet")) == counts["top_repos"]
+
+
+# ── Layout Tests ──────────────────────────────────────────────────────────────
+def write_hour(layer_path, day, hour, repos):
+    from src.pipeline.layout import write_parquet
+    df = pl.DataFrame({
+        "id": [f"{day}-{hour}-{i}" for i in range(len(repos))],
+        "repo_name": repos,
+        "created_at": pl.Series([f"{day}T{hour:02d}:00:00"] * len(repos)).str.to_datetime(),
+        "date": [day] * len(repos),
+        "hour": pl.Series([hour] * len(repos), dtype=pl.Int32),
+    })
+    write_parquet(df, layer_path / f"{day}-{hour}.parquet")
+    return df
+
+
+def test_layout_sorts_by_keys(tmp_path):
+    write_hour(tmp_path, "2024-01-01", 0, ["c/c", "a/a", "b/b"])
+    df = pl.read_parquet(tmp_path / "2024-01-01-0.parquet")
+    assert df["repo_name"].to_list() == ["a/a", "b/b", "c/c"]
+
+
+def test_compaction_daily_keeps_read_hour(tmp_path):
+    from src.pipeline.layout import compact_layer, read_hour
+    write_hour(tmp_path, "2024-01-01", 0, ["a/a", "b/b"])
+    write_hour(tmp_path, "2024-01-01", 1, ["c/c"])
+    write_hour(tmp_path, "2024-01-02", 0, ["d/d"])
+
+    compacted = compact_layer(tmp_path, "day")
+    assert compacted == {"2024-01-01.parquet": 3, "2024-01-02.parquet": 1}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2024-01-01.parquet", "2024-01-02.parquet"]
+
+    df = read_hour(tmp_path, 2024, 1, 1, 1)
+    assert df["repo_name"].to_list() == ["c/c"]
+
+
+def test_compaction_replaces_relanded_hours(tmp_path):
+    from src.pipeline.layout import compact_layer, read_hour
+    write_hour(tmp_path, "2024-01-01", 0, ["a/a", "b/b"])
+    compact_layer(tmp_path, "day")
+    write_hour(tmp_path, "2024-01-01", 0, ["z/z"])
+    write_hour(tmp_path, "2024-01-01", 5, ["e/e"])
+
+    compact_layer(tmp_path, "week")
+    assert [p.name for p in tmp_path.iterdir()] == ["2024-W01.parquet"]
+    assert read_hour(tmp_path, 2024, 1, 1, 0)["repo_name"].to_list() == ["z/z"]
+    assert len(read_hour(tmp_path, 2024, 1, 1, 5)) == 1
+
+
+def test_read_hour_mixed_day_and_week_files(tmp_path):
+    from src.pipeline.layout import compact_layer, read_hour
+    write_hour(tmp_path, "2024-01-01", 0, ["a/a", "b/b"])
+    compact_layer(tmp_path, "week")
+    write_hour(tmp_path, "2024-01-01", 5, ["e/e"])
+    compact_layer(tmp_path, "day")
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2024-01-01.parquet", "2024-W01.parquet"]
+    assert read_hour(tmp_path, 2024, 1, 1, 0)["repo_name"].to_list() == ["a/a", "b/b"]
+    assert read_hour(tmp_path, 2024, 1, 1, 5)["repo_name"].to_list() == ["e/e"]
+
+
+def test_read_hour_missing_raises(tmp_path):
+    from src.pipeline.layout import compact_layer, read_hour
+    write_hour(tmp_path, "2024-01-01", 0, ["a/a"])
+    with pytest.raises(FileNotFoundError):
+        read_hour(tmp_path, 2024, 1, 1, 3)
+    compact_layer(tmp_path, "day")
+    with pytest.raises(FileNotFoundError):
+        read_hour(tmp_path, 2024, 1, 1, 3)
+
+
+# ── Similarity Tests ──────────────────────────────────────────────────────────
+def make_contribution_df():
+    return pl.DataFrame({
+        "actor_login": ["a", "a", "b", "b", "c", "c", "ci[bot]", "ci[bot]"],
+        "repo_name": ["x/1", "x/2", "x/1", "x/2", "x/1", "x/3", "x/2", "x/3"],
+    })
+
+
+def test_similarity_drops_bots_and_high_degree_actors():
+    from src.pipeline.similarity import build_incidence
+    incidence, repos = build_incidence(make_contribution_df(), max_actor_degree=2)
+    assert incidence.shape == (3, 3)
+    assert incidence.nnz == 6
+
+    incidence, _ = build_incidence(make_contribution_df(), max_actor_degree=1)
+    assert incidence.nnz == 0
+
+
+def test_similarity_top_neighbors_batched(tmp_path):
+    from src.pipeline.similarity import to_repo_similarity
+    with patch("src.pipeline.similarity.read_hour", return_value=make_contribution_df()), \
+         patch("src.pipeline.similarity.BATCH_SIZE", 1), \
+         patch("src.pipeline.similarity.GOLD_PATH", tmp_path):
+        df = to_repo_similarity(2024, 1, 1, 0, top_k=1)
+    row = df.filter(pl.col("repo_name") == "x/1")
+    assert row["related_repo"].to_list() == ["x/2"]
+    assert row["shared_contributors"][0] == 2
+    assert row["rank"][0] == 1
+    assert set(df["repo_name"]) == {"x/1", "x/2", "x/3"}
+
+
+# ── Trending Tests ────────────────────────────────────────────────────────────
+def make_trending_hour(repo_events):
+    rows = [(repo, actor, event_type) for repo, actor, event_type, n in repo_events for _ in range(n)]
+    return pl.DataFrame(rows, schema=["repo_name", "actor_login", "type"], orient="row")
+
+
+def run_trending(tmp_path, hours):
+    from src.pipeline.trending import update_trending
+    result = None
+    # Shrink the windows to 4h recent + 12h baseline so tests slide them quickly
+    with patch("src.pipeline.trending.TRENDING_PATH", tmp_path / "trending"), \
+         patch("src.pipeline.trending.GOLD_PATH", tmp_path / "gold"), \
+         patch("src.pipeline.trending.RECENT_HOURS", 4), \
+         patch("src.pipeline.trending.BASELINE_HOURS", 12), \
+         patch("src.pipeline.trending.WINDOW_HOURS", 16):
+        for (day, hour), df in hours:
+            with patch("src.pipeline.trending.read_hour", return_value=df):
+                result = update_trending(2024, 1, day, hour)
+    return result
+
+
+def test_trending_incremental_matches_rebuild(tmp_path):
+    from src.pipeline.trending import read_window, rebuild_window
+    hours = [((1 + h // 24, h % 24), make_trending_hour([
+        ("a/steady", "u1", "WatchEvent", 2),
+        ("b/new", "u2", "ForkEvent", 1 if h > 36 else 0),
+    ])) for h in range(40)]
+    trending = run_trending(tmp_path, hours)
+
+    with patch("src.pipeline.trending.TRENDING_PATH", tmp_path / "trending"), \
+         patch("src.pipeline.trending.RECENT_HOURS", 4), \
+         patch("src.pipeline.trending.WINDOW_HOURS", 16):
+        rebuilt = rebuild_window("repo", datetime(2024, 1, 2, 15))
+        incremental, watermark = read_window("repo")
+    assert watermark == datetime(2024, 1, 2, 15)
+    assert incremental.sort("repo_name").equals(rebuilt.sort("repo_name"))
+
+    steady = incremental.filter(pl.col("repo_name") == "a/steady")
+    assert steady["stars_24h"][0] == 2 * 4
+    assert steady["stars_7d"][0] == 2 * 12
+    assert trending["trending_repos"]["repo_name"][0] == "b/new"
+
+
+def test_trending_expires_old_buckets(tmp_path):
+    hours = [((1, 0), make_trending_hour([("a/old", "u1", "PullRequestEvent", 3)]))]
+    hours += [((1 + h // 24, h % 24), make_trending_hour([("b/b", "u2", "PushEvent", 1)])) for h in range(1, 20)]
+    trending = run_trending(tmp_path, hours)
+    assert "a/old" not in trending["trending_repos"]["repo_name"].to_list()
+    assert len(list((tmp_path / "trending" / "buckets" / "repo").iterdir())) == 16
+
+
+def test_trending_retry_after_partial_failure(tmp_path):
+    from src.pipeline import trending
+    hours = [((1, h), make_trending_hour([("a/a", "u1", "WatchEvent", 1)])) for h in range(3)]
+    run_trending(tmp_path, hours[:2])
+
+    # Repo state for hour 2 is saved, then the actor entity fails
+    advance = trending.advance_window
+    def fail_on_actor(state, entity, ts):
+        if entity == "actor":
+            raise RuntimeError("boom")
+        return advance(state, entity, ts)
+    with patch("src.pipeline.trending.advance_window", side_effect=fail_on_actor), pytest.raises(RuntimeError):
+        run_trending(tmp_path, hours[2:])
+
+    result = run_trending(tmp_path, hours[2:])
+    assert result["trending_repos"]["stars_24h"][0] == 3
+    assert result["trending_contributors"]["stars_24h"][0] == 3
+